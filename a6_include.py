@@ -5,6 +5,14 @@
 #              are available and how they're implemented.
 #              Don't modify the contents of this file.
 
+import sys
+from bisect import bisect_left
+
+# optional, only used for large batches in hash_many and hash_indices
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
@@ -16,7 +24,7 @@ class DynamicArray:
     """
     Class implementing a Dynamic Array
     Supported methods are:
-    append, pop, swap, get_at_index, set_at_index, length
+    append, pop, swap, get_at_index, set_at_index, length, view
     """
 
     def __init__(self, arr=None) -> None:
@@ -55,7 +63,7 @@ class DynamicArray:
 
     def get_at_index(self, index: int):
         """Return value of element at a given index."""
-        if index < 0 or index >= self.length():
+        if index < 0 or index >= len(self._data):
             raise DynamicArrayException
         return self._data[index]
 
@@ -65,7 +73,7 @@ class DynamicArray:
 
     def set_at_index(self, index: int, value: object) -> None:
         """Set value of element at a given index."""
-        if index < 0 or index >= self.length():
+        if index < 0 or index >= len(self._data):
             raise DynamicArrayException
         self._data[index] = value
 
@@ -77,6 +85,30 @@ class DynamicArray:
         """Return length of array."""
         return len(self._data)
 
+    def view(self) -> list:
+        """
+        Return the list backing the array, for trusted internal callers that
+        index it directly without bounds checks or method calls. Indices
+        must already be in range, and the view is only valid until the
+        array is appended to or popped from.
+        """
+        return self._data
+
+    def __sizeof__(self) -> int:
+        """Return bytes used by the array, including its list of slots."""
+        return object.__sizeof__(self) + sys.getsizeof(self._data)
+
+
+def object_size(obj: object) -> int:
+    """
+    Return bytes used by an object and its instance __dict__, if it has one.
+    Objects it refers to are not counted
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
 
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
@@ -96,6 +128,385 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+# Production hash functions, selectable by name in both HashMaps.
+# All of them hash the UTF-8 bytes of the key, except hash_function_builtin
+
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _key_bytes(key) -> bytes:
+    """Return the bytes hashed for a key."""
+    if isinstance(key, (bytes, bytearray)):
+        return bytes(key)
+    return str(key).encode()
+
+
+def _rotl_64(value: int, bits: int) -> int:
+    """Rotate a 64 bit integer left by bits."""
+    return ((value << bits) | (value >> (64 - bits))) & _MASK_64
+
+
+def hash_function_builtin(key: str) -> int:
+    """
+    Python's built-in hash. Fast and well mixed, but string hashes are
+    salted per process unless PYTHONHASHSEED is set
+    """
+    return hash(key)
+
+
+def hash_function_fnv1a(key: str) -> int:
+    """64 bit FNV-1a hash"""
+    hash = 0xCBF29CE484222325
+    for byte in _key_bytes(key):
+        hash = ((hash ^ byte) * 0x100000001B3) & _MASK_64
+    return hash
+
+
+# SipHash key, seeds are mixed into its first half
+_SIPHASH_KEY = (0x0706050403020100, 0x0F0E0D0C0B0A0908)
+
+
+def _sip_rounds(v0: int, v1: int, v2: int, v3: int, count: int) -> tuple:
+    """Apply count SipRounds to the SipHash state and return it."""
+    # rotations are written out inline, this is the hot loop
+    mask = _MASK_64
+    for _ in range(count):
+        v0 = (v0 + v1) & mask
+        v1 = (((v1 << 13) | (v1 >> 51)) & mask) ^ v0
+        v0 = ((v0 << 32) | (v0 >> 32)) & mask
+        v2 = (v2 + v3) & mask
+        v3 = (((v3 << 16) | (v3 >> 48)) & mask) ^ v2
+        v0 = (v0 + v3) & mask
+        v3 = (((v3 << 21) | (v3 >> 43)) & mask) ^ v0
+        v2 = (v2 + v1) & mask
+        v1 = (((v1 << 17) | (v1 >> 47)) & mask) ^ v2
+        v2 = ((v2 << 32) | (v2 >> 32)) & mask
+    return v0, v1, v2, v3
+
+
+def hash_function_siphash(key: str, seed: int = 0) -> int:
+    """
+    SipHash-2-4, a keyed hash that resists hash flooding. Different seeds
+    give independent hash functions
+    """
+    data = _key_bytes(key)
+    k0 = (_SIPHASH_KEY[0] ^ seed) & _MASK_64
+    k1 = _SIPHASH_KEY[1]
+
+    v0 = k0 ^ 0x736F6D6570736575
+    v1 = k1 ^ 0x646F72616E646F6D
+    v2 = k0 ^ 0x6C7967656E657261
+    v3 = k1 ^ 0x7465646279746573
+
+    # full 8 byte words, then the tail padded with the length
+    end = len(data) - len(data) % 8
+    for index in range(0, end + 8, 8):
+        if index < end:
+            word = int.from_bytes(data[index:index + 8], 'little')
+        else:
+            word = (int.from_bytes(data[end:], 'little') |
+                    ((len(data) & 0xFF) << 56))
+
+        v3 ^= word
+        v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+        v0 ^= word
+
+    v2 ^= 0xFF
+    v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 4)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+_XXH_PRIME_1 = 11400714785074694791
+_XXH_PRIME_2 = 14029467366897019727
+_XXH_PRIME_3 = 1609587929392839161
+_XXH_PRIME_4 = 9650029242287828579
+_XXH_PRIME_5 = 2870177450012600261
+
+
+def _xxh_round(acc: int, lane: int) -> int:
+    """Mix one 8 byte lane into an xxHash accumulator."""
+    acc = (acc + lane * _XXH_PRIME_2) & _MASK_64
+    return (_rotl_64(acc, 31) * _XXH_PRIME_1) & _MASK_64
+
+
+def hash_function_xxhash(key: str, seed: int = 0) -> int:
+    """
+    XXH64, a fast non-cryptographic hash with good avalanche. Different
+    seeds give independent hash functions
+    """
+    data = _key_bytes(key)
+    length = len(data)
+    seed &= _MASK_64
+    index = 0
+
+    if length >= 32:
+        accs = [(seed + _XXH_PRIME_1 + _XXH_PRIME_2) & _MASK_64,
+                (seed + _XXH_PRIME_2) & _MASK_64,
+                seed,
+                (seed - _XXH_PRIME_1) & _MASK_64]
+
+        # 32 byte stripes, one 8 byte lane per accumulator
+        while index + 32 <= length:
+            for lane in range(4):
+                accs[lane] = _xxh_round(accs[lane], int.from_bytes(
+                    data[index:index + 8], 'little'))
+                index += 8
+
+        hash = (_rotl_64(accs[0], 1) + _rotl_64(accs[1], 7) +
+                _rotl_64(accs[2], 12) + _rotl_64(accs[3], 18)) & _MASK_64
+        for acc in accs:
+            hash ^= _xxh_round(0, acc)
+            hash = (hash * _XXH_PRIME_1 + _XXH_PRIME_4) & _MASK_64
+    else:
+        hash = (seed + _XXH_PRIME_5) & _MASK_64
+
+    hash = (hash + length) & _MASK_64
+
+    while index + 8 <= length:
+        hash ^= _xxh_round(0, int.from_bytes(data[index:index + 8], 'little'))
+        hash = (_rotl_64(hash, 27) * _XXH_PRIME_1 + _XXH_PRIME_4) & _MASK_64
+        index += 8
+
+    if index + 4 <= length:
+        hash ^= (int.from_bytes(data[index:index + 4], 'little') *
+                 _XXH_PRIME_1) & _MASK_64
+        hash = (_rotl_64(hash, 23) * _XXH_PRIME_2 + _XXH_PRIME_3) & _MASK_64
+        index += 4
+
+    for byte in data[index:]:
+        hash ^= (byte * _XXH_PRIME_5) & _MASK_64
+        hash = (_rotl_64(hash, 11) * _XXH_PRIME_1) & _MASK_64
+
+    # final avalanche
+    hash ^= hash >> 33
+    hash = (hash * _XXH_PRIME_2) & _MASK_64
+    hash ^= hash >> 29
+    hash = (hash * _XXH_PRIME_3) & _MASK_64
+    hash ^= hash >> 32
+    return hash
+
+
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'builtin': hash_function_builtin,
+    'fnv1a': hash_function_fnv1a,
+    'siphash': hash_function_siphash,
+    'xxhash': hash_function_xxhash,
+}
+
+
+def get_hash_function(function) -> callable:
+    """
+    Return the hash function for a name in HASH_FUNCTIONS. Callables are
+    returned unchanged
+    """
+    if callable(function):
+        return function
+
+    if function not in HASH_FUNCTIONS:
+        raise ValueError(f"unknown hash function {function!r}, expected one "
+                         f"of {', '.join(HASH_FUNCTIONS)}")
+    return HASH_FUNCTIONS[function]
+
+
+# ------------- Batch hashing (SC & OA)  ------------------ #
+
+# below this many keys the per-call overhead of NumPy outweighs the savings
+_BATCH_MIN = 64
+
+
+def _flat_codes(keys: list, utf8: bool) -> tuple:
+    """
+    Return (codes, lengths, offsets) for a list of str keys. codes holds the
+    units of every key back to back with a trailing 0, the Unicode code
+    points as uint32 or, if utf8, the UTF-8 bytes as uint8. Key i is
+    codes[offsets[i]:offsets[i] + lengths[i]]
+    """
+    joined = ''.join(keys)
+    if utf8:
+        data = joined.encode() + b'\0'
+        dtype = np.uint8
+    else:
+        data = joined.encode('utf-32-le') + bytes(4)
+        dtype = np.dtype('<u4')
+
+    # ASCII keys have one unit per character in either encoding
+    if not utf8 or joined.isascii():
+        sizes = map(len, keys)
+    else:
+        sizes = (len(key.encode()) for key in keys)
+
+    lengths = np.fromiter(sizes, dtype=np.int64, count=len(keys))
+    offsets = np.zeros(len(keys), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    return np.frombuffer(data, dtype=dtype), lengths, offsets
+
+
+def _sum_per_key(values, lengths, offsets):
+    """
+    Return the sum of each key's run of values as uint64. reduceat gives an
+    empty run the value at its offset instead of 0, so those are zeroed
+    """
+    sums = np.add.reduceat(values.astype(np.uint64), offsets)
+    return np.where(lengths > 0, sums, np.uint64(0))
+
+
+def _hash_function_1_batch(keys: list):
+    """hash_function_1 of every key, as a NumPy uint64 array."""
+    codes, lengths, offsets = _flat_codes(keys, False)
+    return _sum_per_key(codes, lengths, offsets)
+
+
+def _hash_function_2_batch(keys: list):
+    """hash_function_2 of every key, as a NumPy uint64 array."""
+    codes, lengths, offsets = _flat_codes(keys, False)
+
+    # 1-based position of every code point within its own key
+    positions = np.arange(1, len(codes) + 1, dtype=np.uint64)
+    positions[:-1] -= np.repeat(offsets, lengths).astype(np.uint64)
+    return _sum_per_key(codes * positions, lengths, offsets)
+
+
+def _hash_function_fnv1a_batch(keys: list):
+    """
+    hash_function_fnv1a of every key, as a NumPy uint64 array. Keys are laid
+    out as the rows of a zero padded byte matrix, each step runs down one
+    column for all keys at once, and keys that have run out of bytes keep
+    their hash. uint64 arithmetic wraps, which is the 64 bit mask
+    """
+    data, lengths, _ = _flat_codes(keys, True)
+    matrix = np.zeros((len(keys), int(lengths.max(initial=0))),
+                      dtype=np.uint8)
+    matrix[np.arange(matrix.shape[1]) < lengths[:, None]] = data[:-1]
+
+    hashes = np.full(len(keys), 0xCBF29CE484222325, dtype=np.uint64)
+    prime = np.uint64(0x100000001B3)
+    for column in range(matrix.shape[1]):
+        stepped = (hashes ^ matrix[:, column]) * prime
+        hashes = np.where(column < lengths, stepped, hashes)
+    return hashes
+
+
+# scalar hash functions with an array version used by hash_many
+_BATCH_FUNCTIONS = {
+    hash_function_1: _hash_function_1_batch,
+    hash_function_2: _hash_function_2_batch,
+    hash_function_fnv1a: _hash_function_fnv1a_batch,
+}
+
+
+def hash_many(function: callable, keys: list) -> list:
+    """
+    Return [function(key) for key in keys]. When NumPy is installed and
+    every key is a str, hash_function_1, hash_function_2 and
+    hash_function_fnv1a are computed for the whole batch with array
+    operations, with the same results as the scalar functions
+    """
+    batch = _BATCH_FUNCTIONS.get(function)
+    if (np is None or batch is None or len(keys) < _BATCH_MIN or
+            not all(type(key) is str for key in keys)):
+        return list(map(function, keys))
+
+    try:
+        return batch(keys).tolist()
+    except UnicodeEncodeError:
+        # lone surrogates have no UTF encoding, the scalar path decides
+        return list(map(function, keys))
+
+
+def hash_indices(hashes: list, capacity: int) -> list:
+    """
+    Return [hash % capacity for hash in hashes], the bucket of each hash,
+    computed in one NumPy operation when it is installed. For a power of
+    two capacity this equals masking off the low bits
+    """
+    if np is not None and len(hashes) >= _BATCH_MIN:
+        # signed hashes such as hash()'s fit int64, 64 bit unsigned ones
+        # such as FNV-1a's fit uint64, anything else stays in Python
+        for dtype in (np.int64, np.uint64):
+            try:
+                values = np.array(hashes, dtype=dtype)
+            except OverflowError:
+                continue
+            return (values % capacity).tolist()
+
+    return [hash % capacity for hash in hashes]
+
+
+# ------------- Capacity selection (SC & OA)  ------------------ #
+
+def _sieve(limit: int) -> list:
+    """Return every prime below limit using the sieve of Eratosthenes."""
+    flags = bytearray([1]) * limit
+    flags[0] = flags[1] = 0
+    for factor in range(2, int(limit ** 0.5) + 1):
+        if flags[factor]:
+            flags[factor * factor::factor] = \
+                bytes(len(range(factor * factor, limit, factor)))
+    return [number for number in range(limit) if flags[number]]
+
+
+# Every prime below 2^16. Small capacities are answered with a binary search
+# and larger candidates are screened by trial division before Miller-Rabin
+SMALL_PRIMES = tuple(_sieve(1 << 16))
+
+# Miller-Rabin with these bases is deterministic for n < 3.3 * 10^24
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def is_prime(number: int) -> bool:
+    """Determine if given integer is a prime number and return boolean"""
+    if number <= SMALL_PRIMES[-1]:
+        index = bisect_left(SMALL_PRIMES, number)
+        return SMALL_PRIMES[index] == number
+
+    for prime in SMALL_PRIMES[:64]:
+        if number % prime == 0:
+            return False
+
+    # number - 1 = d * 2^r with d odd
+    d, r = number - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+
+    for witness in _WITNESSES:
+        x = pow(witness, d, number)
+        if x == 1 or x == number - 1:
+            continue
+        for _ in range(r - 1):
+            x = x * x % number
+            if x == number - 1:
+                break
+        else:
+            return False
+
+    return True
+
+
+def next_prime(number: int) -> int:
+    """
+    Return the smallest odd prime greater than or equal to number, the same
+    result as stepping through odd numbers with is_prime
+    """
+    if number % 2 == 0:
+        number += 1
+
+    if number <= SMALL_PRIMES[-1]:
+        return SMALL_PRIMES[bisect_left(SMALL_PRIMES, max(number, 3))]
+
+    while not is_prime(number):
+        number += 2
+
+    return number
+
+
+def next_power_of_two(number: int) -> int:
+    """Return the smallest power of two, at least 2, >= number"""
+    return 1 << max(1, (number - 1).bit_length())
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,17 +514,33 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """
+        Initialize node given a key and value, and optionally the full hash
+        of the key so it doesn't have to be recomputed
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return '(' + str(self.key) + ': ' + str(self.value) + ')'
 
 
+class SlottedSLNode:
+    """
+    SLNode with __slots__ instead of a per-instance __dict__. Same
+    attributes and methods as SLNode, at a fraction of the memory
+    """
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    __init__ = SLNode.__init__
+    __str__ = SLNode.__str__
+
+
 class LinkedListIterator:
     """
     Separate iterator class for LinkedList
@@ -138,12 +565,20 @@ class LinkedListIterator:
         return current_node
 
 
+# self-organizing policies accepted by LinkedList.search
+CHAIN_POLICIES = (None, 'move_to_front', 'transpose')
+
+
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, insert_node, remove, contains, search,
+    length, iterator
     """
 
+    # class of the nodes created by insert
+    _node_class = SLNode
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -168,20 +603,27 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = self._node_class(key, value, self._head, hash)
+        self._size += 1
+
+    def insert_node(self, node: SLNode) -> None:
+        """Insert an existing node at front of the list."""
+        node.next = self._head
+        self._head = node
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If hash is given, keys are only compared on nodes with that hash.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -192,28 +634,172 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If hash is given, keys are only compared on nodes with that hash.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 return node
             node = node.next
         return node
 
+    def search(self, key: str, hash: int = None, policy: str = None) -> tuple:
+        """
+        Return (node with matching key or None, number of nodes visited).
+        With policy 'move_to_front' a matching node is moved to the head,
+        and with 'transpose' it swaps places with the node before it, so
+        often searched keys drift towards the head.
+        If hash is given, keys are only compared on nodes with that hash.
+        """
+        before, previous, node = None, None, self._head
+        visited = 0
+        while node:
+            visited += 1
+            if (hash is None or node.hash == hash) and node.key == key:
+                if previous is not None and policy == 'move_to_front':
+                    previous.next = node.next
+                    node.next = self._head
+                    self._head = node
+                elif previous is not None and policy == 'transpose':
+                    previous.next = node.next
+                    node.next = previous
+                    if before is not None:
+                        before.next = node
+                    else:
+                        self._head = node
+                return node, visited
+
+            before, previous, node = previous, node, node.next
+        return None, visited
+
     def length(self) -> int:
         """Return the length of the list."""
         return self._size
 
 
+class SlottedLinkedList:
+    """
+    LinkedList with __slots__ instead of a per-instance __dict__, whose
+    insert creates SlottedSLNodes. Same attributes and methods as LinkedList
+    """
+    __slots__ = ('_head', '_size')
+
+    _node_class = SlottedSLNode
+
+    __init__ = LinkedList.__init__
+    __str__ = LinkedList.__str__
+    __iter__ = LinkedList.__iter__
+    insert = LinkedList.insert
+    insert_node = LinkedList.insert_node
+    remove = LinkedList.remove
+    contains = LinkedList.contains
+    search = LinkedList.search
+    length = LinkedList.length
+
+
+class SortedChain:
+    """
+    Chain of nodes kept in a list sorted by (hash, key), so that contains,
+    insert and remove binary search it instead of walking every node. Used
+    in place of a LinkedList once a hash map bucket grows long.
+    Supported methods are the same as LinkedList, but hash is required and
+    keys with equal hashes must be orderable, as str keys are
+    """
+    __slots__ = ('_order', '_nodes', '_node_class')
+
+    def __init__(self, node_class: type = SLNode, nodes=()) -> None:
+        """
+        Initialize new sorted chain holding nodes, whose keys must all be
+        different
+        param node_class: class of the nodes created by insert
+        """
+        self._node_class = node_class
+        self._nodes = sorted(nodes, key=lambda node: (node.hash, node.key))
+        self._order = [(node.hash, node.key) for node in self._nodes]
+        for node in self._nodes:
+            node.next = None
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'SORTED [' + ' -> '.join(map(str, self._nodes)) + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes, in (hash, key) order."""
+        return iter(self._nodes)
+
+    def __sizeof__(self) -> int:
+        """Return bytes used by the chain, including its lists and keys."""
+        return (object.__sizeof__(self) + sys.getsizeof(self._nodes) +
+                sys.getsizeof(self._order) +
+                sum(sys.getsizeof(pair) for pair in self._order))
+
+    def _find(self, key: str, hash: int) -> int:
+        """Return the index of the node with matching key, or None."""
+        pair = (hash, key)
+        index = bisect_left(self._order, pair)
+        if index < len(self._order) and self._order[index] == pair:
+            return index
+        return None
+
+    def insert(self, key: str, value: object, hash: int = None) -> None:
+        """Insert new node at its sorted position."""
+        self.insert_node(self._node_class(key, value, None, hash))
+
+    def insert_node(self, node: SLNode) -> None:
+        """Insert an existing node at its sorted position."""
+        pair = (node.hash, node.key)
+        index = bisect_left(self._order, pair)
+        self._order.insert(index, pair)
+        self._nodes.insert(index, node)
+        node.next = None
+
+    def remove(self, key: str, hash: int = None) -> bool:
+        """
+        Remove node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        index = self._find(key, hash)
+        if index is None:
+            return False
+
+        del self._order[index]
+        del self._nodes[index]
+        return True
+
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """Return node with matching key, or None if no match."""
+        index = self._find(key, hash)
+        if index is None:
+            return None
+        return self._nodes[index]
+
+    def search(self, key: str, hash: int = None, policy: str = None) -> tuple:
+        """
+        Return (node with matching key or None, number of nodes compared by
+        the binary search). The order is fixed, so policy is ignored
+        """
+        return self.contains(key, hash), max(1, len(self._nodes).bit_length())
+
+    def length(self) -> int:
+        """Return the number of nodes in the chain."""
+        return len(self._nodes)
+
+
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map, optionally with the full
+        hash of the key so it doesn't have to be recomputed
+        """
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -221,3 +807,14 @@ class HashEntry:
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return f"K: {self.key} V: {self.value} TS: {self.is_tombstone}"
+
+
+class SlottedHashEntry:
+    """
+    HashEntry with __slots__ instead of a per-instance __dict__. Same
+    attributes and methods as HashEntry, at a fraction of the memory
+    """
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    __init__ = HashEntry.__init__
+    __str__ = HashEntry.__str__
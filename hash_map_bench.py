@@ -0,0 +1,939 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Timing benchmarks for the hash map implementations. Each
+# benchmark builds maps of increasing size and reports the average cost of
+# an operation so that growth in cost (or the lack of it) is easy to see.
+# Python's built-in hash is used as the hash function by default, since the
+# sample hash functions collide too heavily at these sizes to isolate the
+# cost of the map itself.
+# Benchmarks:
+# bench_oa_lookup() - average get/contains_key cost of the open addressing
+# map as it grows.
+# bench_sc_lookup() - bucket-targeted contains_key/remove of the separate
+# chaining map compared with a scan over every bucket.
+# bench_put_latency() - tail latency of put for both maps, with and without
+# incremental resizing.
+# bench_hash_distribution() - max chain length and average probe length of
+# each hash function in a6_include.HASH_FUNCTIONS on realistic key sets.
+# bench_memory() - bytes per entry of each storage backend, measured with
+# tracemalloc.
+# bench_batch() - put_many/get_many/remove_many and from_items compared with
+# a loop of single put/get/remove calls.
+# bench_robin_hood() - probe lengths and lookup cost of quadratic probing
+# against Robin Hood probing as the table fills.
+# bench_read_latency() - tail latency of get for the open addressing,
+# separate chaining and cuckoo maps.
+# bench_swiss() - hit and miss lookups of the swiss table against the open
+# addressing map, with the number of key comparisons per miss.
+# bench_treeify() - get on separate chaining buckets full of colliding keys,
+# with and without SortedChain buckets.
+# bench_chain_policy() - nodes visited and time per get of the separate
+# chaining chain policies under a Zipfian read workload.
+# bench_batch_hashing() - a6_include.hash_many and hash_indices compared with
+# hashing one key at a time. The two only differ when NumPy is installed.
+# bench_find_mode() - find_mode and top_k over a Zipfian stream, counted one
+# value at a time and in numpy.unique chunks.
+# bench_concurrent() - throughput of the thread-safe map from 1, 4 and 16
+# threads, against the separate chaining map behind a single lock.
+# bench_sharded() - batched put/get throughput of the multi-process sharded
+# map at several shard counts, against one map in this process.
+# bench_shared() - building, opening and reading the shared memory table
+# against rebuilding the open addressing map with put.
+# bench_probe_cost() - cost per probe step of the open addressing probe loop
+# through the bounds-checked DynamicArray accessors and through its view.
+
+import gc
+import itertools
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import hash_map_concurrent
+import hash_map_cuckoo
+import hash_map_oa
+import hash_map_oa_compact
+import hash_map_sc
+import hash_map_shared
+import hash_map_sharded
+import hash_map_swiss
+from a6_include import (HASH_FUNCTIONS, next_prime, hash_many, hash_indices,
+                        hash_function_1, hash_function_2, hash_function_fnv1a)
+
+
+def _time_per_op(fn, keys) -> float:
+    """
+    Call fn once for every key and return the average time per call
+    param fn: callable taking a single key
+    param keys: list of keys to pass to fn
+    return float: average seconds per call
+    """
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - start) / len(keys)
+
+
+def _report(title: str, rows: list) -> None:
+    """
+    Print a small table of (size, label, seconds per op) rows
+    """
+    print("\n" + title)
+    print("-" * len(title))
+    for size, label, seconds in rows:
+        print(f"{size:>10} {label:<24} {seconds * 1e6:8.3f} us/op")
+
+
+def bench_oa_lookup(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6),
+                    samples: int = 10000,
+                    function: callable = hash) -> list:
+    """
+    Average hit and miss lookup cost of the open addressing map
+    param sizes: number of entries to load before measuring
+    param samples: number of lookups measured at each size
+    param function: hash function handed to the map
+    return list: rows of (size, label, seconds per op)
+    """
+    rows = []
+    for size in sizes:
+        m = hash_map_oa.HashMap(size, function)
+        for i in range(size):
+            m.put('str' + str(i), i)
+
+        step = max(1, size // samples)
+        hits = ['str' + str(i) for i in range(0, size, step)]
+        misses = ['miss' + str(i) for i in range(len(hits))]
+
+        rows.append((size, 'get (hit)', _time_per_op(m.get, hits)))
+        rows.append((size, 'get (miss)', _time_per_op(m.get, misses)))
+        rows.append((size, 'contains_key (hit)',
+                     _time_per_op(m.contains_key, hits)))
+
+    return rows
+
+
+def _scan_contains_key(m: hash_map_sc.HashMap, key: str) -> bool:
+    """
+    Reference contains_key that walks every bucket and chain, used as the
+    baseline in bench_sc_lookup()
+    """
+    for bucket in range(m.get_capacity()):
+        for item in m._buckets.get_at_index(bucket):
+            if item.key == key:
+                return True
+    return False
+
+
+def _scan_remove(m: hash_map_sc.HashMap, key: str) -> bool:
+    """
+    Reference remove that walks every bucket and chain, used as the
+    baseline in bench_sc_lookup()
+    """
+    for bucket in range(m.get_capacity()):
+        chain = m._buckets.get_at_index(bucket)
+        for item in chain:
+            if item.key == key:
+                chain.remove(key)
+                m._size -= 1
+                return True
+    return False
+
+
+def bench_sc_lookup(sizes=(10 ** 4, 10 ** 5, 10 ** 6),
+                    samples: int = 10000,
+                    scan_samples: int = 20,
+                    function: callable = hash) -> list:
+    """
+    Cost of contains_key and remove on the separate chaining map, comparing
+    the bucket-targeted methods with a scan over every bucket
+    param sizes: number of entries to load before measuring
+    param samples: number of operations measured for the hashed paths
+    param scan_samples: number of operations measured for the scan paths,
+    kept small because each one visits the whole table
+    param function: hash function handed to the map
+    return list: rows of (size, label, seconds per op)
+    """
+    rows = []
+    for size in sizes:
+        m = hash_map_sc.HashMap(size, function)
+        for i in range(size):
+            m.put('str' + str(i), i)
+
+        step = max(1, size // samples)
+        hits = ['str' + str(i) for i in range(0, size, step)]
+        scan_hits = hits[:scan_samples]
+
+        rows.append((size, 'contains_key (scan)',
+                     _time_per_op(lambda k: _scan_contains_key(m, k),
+                                  scan_hits)))
+        rows.append((size, 'contains_key (hashed)',
+                     _time_per_op(m.contains_key, hits)))
+
+        # removed keys are put back so both paths see the same table
+        rows.append((size, 'remove (scan)',
+                     _time_per_op(lambda k: _scan_remove(m, k), scan_hits)))
+        for key in scan_hits:
+            m.put(key, 0)
+        rows.append((size, 'remove (hashed)', _time_per_op(m.remove, hits)))
+
+    return rows
+
+
+def bench_put_latency(sizes=(10 ** 4, 10 ** 5, 10 ** 6),
+                      function: callable = hash) -> list:
+    """
+    Latency percentiles of put while filling each map from its default
+    capacity, with and without incremental resizing. The garbage collector
+    is paused while timing so its pauses aren't mistaken for resizes
+    param sizes: number of entries to put
+    param function: hash function handed to the map
+    return list: rows of (size, label, seconds)
+    """
+    rows = []
+    gcEnabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        for size in sizes:
+            for name, make in (('oa', hash_map_oa.HashMap),
+                               ('sc', hash_map_sc.HashMap)):
+                for incremental in (False, True):
+                    m = make(11, function, incremental=incremental)
+                    latencies = []
+                    for i in range(size):
+                        key = 'str' + str(i)
+                        start = time.perf_counter()
+                        m.put(key, i)
+                        latencies.append(time.perf_counter() - start)
+
+                    latencies.sort()
+                    mode = 'incremental' if incremental else 'full'
+                    for label, rank in (('p50', 0.5), ('p99', 0.99),
+                                        ('max', 1.0)):
+                        index = min(size - 1, int(rank * size))
+                        rows.append((size, f'{name} put {label} ({mode})',
+                                     latencies[index]))
+    finally:
+        if gcEnabled:
+            gc.enable()
+
+    return rows
+
+
+def _key_sets(size: int) -> dict:
+    """
+    Return realistic key sets of the given size: sequential 'str' + i keys,
+    URLs and random UUIDs
+    """
+    rnd = random.Random(size)
+    sections = ('news', 'sports', 'shop', 'users', 'search')
+    return {
+        "'str' + i": ['str' + str(i) for i in range(size)],
+        'urls': [f'https://example.com/{sections[i % 5]}/item/{i}'
+                 f'?page={i % 50}' for i in range(size)],
+        'uuids': [str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+                  for _ in range(size)],
+    }
+
+
+def _probe_length(m: hash_map_oa.HashMap, key: str) -> int:
+    """
+    Return the number of indices visited by a successful lookup of key
+    """
+    capacity = m.get_capacity()
+    index = m._hash_index(m._hash_function(key), capacity)
+    step = 1
+
+    # Robin Hood probing is linear, one index per step of displacement
+    if m._robin_hood:
+        target = m._find_live(m._buckets, capacity, m._hash_function(key), key)
+        return m._displacement(m._buckets.get_at_index(target), target) + 1
+    probes = 1
+
+    while m._buckets.get_at_index(index).key != key:
+        index = (index + step) % capacity
+        step += m._probe_step
+        probes += 1
+
+    return probes
+
+
+def bench_hash_distribution(size: int = 20000,
+                            functions=tuple(HASH_FUNCTIONS)) -> list:
+    """
+    Quality and speed of each hash function on each key set. Reports the
+    longest chain of a separate chaining map, the average probe length of
+    a successful open addressing lookup, and the time per hash
+    param size: number of keys in each key set
+    param functions: names of the hash functions to compare
+    return list: rows of (key set, function, max chain length,
+    average probe length, seconds per hash)
+    """
+    rows = []
+    for keySet, keys in _key_sets(size).items():
+        for name in functions:
+            function = HASH_FUNCTIONS[name]
+
+            sc = hash_map_sc.HashMap(size, function)
+            oa = hash_map_oa.HashMap(size * 2, function)
+            for key in keys:
+                sc.put(key, None)
+                oa.put(key, None)
+
+            maxChain = max(sc._buckets.get_at_index(bucket).length()
+                           for bucket in range(sc.get_capacity()))
+            avgProbe = sum(_probe_length(oa, key) for key in keys) / size
+
+            rows.append((keySet, name, maxChain, avgProbe,
+                         _time_per_op(function, keys)))
+
+    return rows
+
+
+def _report_distribution(rows: list) -> None:
+    """
+    Print the rows returned by bench_hash_distribution()
+    """
+    title = "Hash function distribution"
+    print("\n" + title)
+    print("-" * len(title))
+    print(f"{'key set':<10} {'function':<16} {'max chain':>9} "
+          f"{'avg probe':>9} {'us/hash':>8}")
+    for keySet, name, maxChain, avgProbe, seconds in rows:
+        print(f"{keySet:<10} {name:<16} {maxChain:>9} {avgProbe:>9.2f} "
+              f"{seconds * 1e6:>8.3f}")
+
+
+def bench_memory(sizes=(10 ** 4, 10 ** 5, 10 ** 6),
+                 function: callable = hash) -> list:
+    """
+    Memory allocated by each map per entry, not counting the keys and
+    values themselves, which are created before measuring starts
+    param sizes: number of entries to put
+    param function: hash function handed to the map
+    return list: rows of (size, backend, bytes per entry)
+    """
+    backends = (('oa (HashEntry)', hash_map_oa.HashMap),
+                ('oa (slots)', lambda capacity, function:
+                    hash_map_oa.HashMap(capacity, function, slots=True)),
+                ('oa (compact)', hash_map_oa_compact.HashMap),
+                ('sc (LinkedList)', hash_map_sc.HashMap),
+                ('sc (slots)', lambda capacity, function:
+                    hash_map_sc.HashMap(capacity, function, slots=True)))
+    rows = []
+
+    for size in sizes:
+        keys = ['str' + str(i) for i in range(size)]
+        values = list(range(size))
+
+        for name, make in backends:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                m = make(11, function)
+                for i in range(size):
+                    m.put(keys[i], values[i])
+                used = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+
+            rows.append((size, name, used / size))
+            del m
+
+    return rows
+
+
+def _report_memory(rows: list) -> None:
+    """
+    Print the rows returned by bench_memory()
+    """
+    title = "Memory per entry"
+    print("\n" + title)
+    print("-" * len(title))
+    for size, name, perEntry in rows:
+        print(f"{size:>10} {name:<24} {perEntry:8.1f} bytes/entry")
+
+
+def bench_batch(sizes=(10 ** 4, 10 ** 5, 10 ** 6),
+                function: callable = hash) -> list:
+    """
+    Average cost per key of loading, reading and emptying each map from its
+    default capacity, with a loop of single calls and with one batch call,
+    and of building it with from_items
+    param sizes: number of entries in the batch
+    param function: hash function handed to the map
+    return list: rows of (size, label, seconds per key)
+    """
+    rows = []
+    for size in sizes:
+        keys = ['str' + str(i) for i in range(size)]
+        pairs = [(key, i) for i, key in enumerate(keys)]
+
+        for name, make in (('oa', hash_map_oa.HashMap),
+                           ('sc', hash_map_sc.HashMap)):
+            m = make(11, function)
+            rows.append((size, f'{name} put (loop)',
+                         _time_per_op(lambda pair: m.put(*pair), pairs)))
+            rows.append((size, f'{name} get (loop)', _time_per_op(m.get, keys)))
+            rows.append((size, f'{name} remove (loop)',
+                         _time_per_op(m.remove, keys)))
+
+            rows.append((size, f'{name} from_items',
+                         _time_per_op(lambda items: make.from_items(
+                             items, function), [pairs]) / size))
+
+            m = make(11, function)
+            for label, batch, arg in (('put_many', m.put_many, pairs),
+                                      ('get_many', m.get_many, keys),
+                                      ('remove_many', m.remove_many, keys)):
+                rows.append((size, f'{name} {label}',
+                             _time_per_op(batch, [arg]) / size))
+
+    return rows
+
+
+def bench_robin_hood(capacity: int = 2 ** 17 - 1,
+                     loads=(0.25, 0.5, 0.7, 0.85),
+                     samples: int = 10000,
+                     function: callable = hash) -> list:
+    """
+    Average and longest probe length of a successful lookup, and the cost
+    of hit and miss lookups, for quadratic and Robin Hood probing at each
+    load factor. Quadratic probing only runs up to its 0.5 threshold
+    param capacity: table capacity, reserved up front so it doesn't grow
+    param loads: load factors to measure at
+    param samples: number of lookups timed at each load
+    param function: hash function handed to the map
+    return list: rows of (mode, load factor, average probes, max probes,
+    seconds per hit, seconds per miss)
+    """
+    rows = []
+    for mode, robinHood in (('quadratic', False), ('robin hood', True)):
+        m = hash_map_oa.HashMap(capacity, function, robin_hood=robinHood)
+        count = 0
+
+        for load in loads:
+            if load > m._threshold:
+                continue
+
+            while count < int(load * m.get_capacity()):
+                m.put('str' + str(count), count)
+                count += 1
+
+            keys = ['str' + str(i) for i in range(count)]
+            probes = [_probe_length(m, key) for key in keys]
+            step = max(1, count // samples)
+            hits = keys[::step]
+            misses = ['miss' + str(i) for i in range(len(hits))]
+
+            rows.append((mode, m.table_load(), sum(probes) / count,
+                         max(probes), _time_per_op(m.get, hits),
+                         _time_per_op(m.get, misses)))
+
+    return rows
+
+
+def _report_robin_hood(rows: list) -> None:
+    """
+    Print the rows returned by bench_robin_hood()
+    """
+    title = "OA - quadratic vs Robin Hood probing"
+    print("\n" + title)
+    print("-" * len(title))
+    print(f"{'mode':<12} {'load':>5} {'avg probe':>9} {'max probe':>9} "
+          f"{'hit us':>7} {'miss us':>7}")
+    for mode, load, avgProbe, maxProbe, hit, miss in rows:
+        print(f"{mode:<12} {load:>5.2f} {avgProbe:>9.2f} {maxProbe:>9} "
+              f"{hit * 1e6:>7.3f} {miss * 1e6:>7.3f}")
+
+
+def bench_read_latency(sizes=(10 ** 4, 10 ** 5, 10 ** 6),
+                       samples: int = 100000,
+                       functions=(hash, 'fnv1a', 'hash_function_1',
+                                  'hash_function_2'),
+                       sample_size_limit: int = 10 ** 4) -> list:
+    """
+    Latency percentiles of get on each map, half hits and half misses, after
+    filling it from its default capacity. The garbage collector is paused
+    while timing so its pauses aren't mistaken for slow reads
+    param sizes: number of entries to put
+    param samples: number of reads timed at each size
+    param functions: hash functions handed to the maps
+    param sample_size_limit: largest size the sample hash functions
+    hash_function_1 and hash_function_2 are run at. They collide so heavily
+    that filling oa and sc with more keys takes hours
+    return list: rows of (size, label, seconds)
+    """
+    maps = (('oa', hash_map_oa.HashMap),
+            ('sc', hash_map_sc.HashMap),
+            ('cuckoo', hash_map_cuckoo.HashMap))
+    rows = []
+    gcEnabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        for size in sizes:
+            step = max(1, 2 * size // samples)
+            reads = []
+            for i in range(0, size, step):
+                reads.append('str' + str(i))
+                reads.append('miss' + str(i))
+
+            for function in functions:
+                name = getattr(function, '__name__', function)
+                if name in ('hash_function_1', 'hash_function_2') and \
+                        size > sample_size_limit:
+                    continue
+
+                for mapName, make in maps:
+                    m = make(11, function)
+                    for i in range(size):
+                        m.put('str' + str(i), i)
+
+                    latencies = []
+                    for key in reads:
+                        start = time.perf_counter()
+                        m.get(key)
+                        latencies.append(time.perf_counter() - start)
+
+                    latencies.sort()
+                    for label, rank in (('p50', 0.5), ('p99', 0.99),
+                                        ('p99.9', 0.999), ('max', 1.0)):
+                        index = min(len(latencies) - 1,
+                                    int(rank * len(latencies)))
+                        rows.append((size, f'{mapName} get {label} ({name})',
+                                     latencies[index]))
+    finally:
+        if gcEnabled:
+            gc.enable()
+
+    return rows
+
+
+class _CountingKey(str):
+    """
+    str that counts how often it is compared for equality, used by
+    bench_swiss() to see how many keys a lookup reads
+    """
+    compares = 0
+
+    def __eq__(self, other) -> bool:
+        _CountingKey.compares += 1
+        return str.__eq__(self, other)
+
+    __hash__ = str.__hash__
+
+
+def bench_swiss(sizes=(10 ** 4, 10 ** 5, 10 ** 6), samples: int = 20000,
+                function: callable = hash) -> list:
+    """
+    Average cost of hit and miss lookups on the open addressing map and the
+    swiss table, and the number of stored keys compared per miss
+    param sizes: number of entries to load before measuring
+    param samples: number of lookups measured at each size
+    param function: hash function handed to the map
+    return list: rows of (size, map, load factor, seconds per hit,
+    seconds per miss, key compares per miss)
+    """
+    rows = []
+    for size in sizes:
+        keys = [_CountingKey('str' + str(i)) for i in range(size)]
+        step = max(1, size // samples)
+        hits = [str(key) for key in keys[::step]]
+        misses = ['miss' + str(i) for i in range(len(hits))]
+
+        for name, make in (('oa', hash_map_oa.HashMap),
+                           ('swiss', hash_map_swiss.HashMap)):
+            m = make(11, function)
+            for i in range(size):
+                m.put(keys[i], i)
+
+            _CountingKey.compares = 0
+            missSeconds = _time_per_op(m.get, misses)
+            compares = _CountingKey.compares / len(misses)
+
+            rows.append((size, name, m.table_load(),
+                         _time_per_op(m.get, hits), missSeconds, compares))
+
+    return rows
+
+
+def _report_swiss(rows: list) -> None:
+    """
+    Print the rows returned by bench_swiss()
+    """
+    title = "Swiss table vs open addressing lookups"
+    print("\n" + title)
+    print("-" * len(title))
+    print(f"{'size':>10} {'map':<6} {'load':>5} {'hit us':>7} {'miss us':>7} "
+          f"{'compares/miss':>13}")
+    for size, name, load, hit, miss, compares in rows:
+        print(f"{size:>10} {name:<6} {load:>5.2f} {hit * 1e6:>7.3f} "
+              f"{miss * 1e6:>7.3f} {compares:>13.4f}")
+
+
+def bench_treeify(letters=('abcdef', 'abcdefg', 'abcdefgh'),
+                  samples: int = 2000) -> list:
+    """
+    Average get cost on the separate chaining map using hash_function_1,
+    which gives every permutation of a string the same hash, so all of them
+    land in one bucket. Compared with the same map kept on linked lists
+    param letters: strings whose permutations are used as keys
+    param samples: number of lookups measured for each string
+    return list: rows of (number of keys, label, seconds per op)
+    """
+    rows = []
+    for word in letters:
+        keys = [''.join(p) for p in itertools.permutations(word)]
+        step = max(1, len(keys) // samples)
+        hits = keys[::step]
+
+        for label, threshold in (('get (linked list)', float('inf')),
+                                 ('get (sorted chain)', None)):
+            m = hash_map_sc.HashMap(11, hash_function_1)
+            if threshold is not None:
+                m._TREEIFY_THRESHOLD = threshold
+            m.put_many((key, i) for i, key in enumerate(keys))
+            rows.append((len(keys), label, _time_per_op(m.get, hits)))
+
+    return rows
+
+
+def _zipf_keys(keys: list, count: int, skew: float = 1.0,
+               seed: int = 0) -> list:
+    """
+    Return count keys drawn from keys with Zipfian frequencies, the i-th key
+    weighted 1 / i ** skew. Hot keys are spread over the key list rather
+    than being the first ones put
+    """
+    rnd = random.Random(seed)
+    ranked = keys[:]
+    rnd.shuffle(ranked)
+    weights = [1 / (rank + 1) ** skew for rank in range(len(ranked))]
+    return rnd.choices(ranked, weights=weights, k=count)
+
+
+def bench_chain_policy(size: int = 10 ** 5, reads: int = 200000,
+                       functions=(hash, 'hash_function_2')) -> list:
+    """
+    Average nodes visited and time per get on the separate chaining map for
+    each chain policy, under a Zipfian read workload. The map is filled to
+    a load factor of about 1, so chains hold a few nodes each
+    param size: number of entries to put
+    param reads: number of gets in the workload
+    param functions: hash functions handed to the map
+    return list: rows of (function, policy, average nodes visited,
+    seconds per get)
+    """
+    keys = ['str' + str(i) for i in range(size)]
+    workload = _zipf_keys(keys, reads)
+    rows = []
+
+    for function in functions:
+        name = getattr(function, '__name__', function)
+        for policy in (None, 'move_to_front', 'transpose'):
+            m = hash_map_sc.HashMap(size, function, chain_policy=policy)
+            m.put_many((key, i) for i, key in enumerate(keys))
+            seconds = _time_per_op(m.get, workload)
+            rows.append((name, policy or 'none', m.average_visits(), seconds))
+
+    return rows
+
+
+def _report_chain_policy(rows: list) -> None:
+    """
+    Print the rows returned by bench_chain_policy()
+    """
+    title = "SC - chain policies under a Zipfian read workload"
+    print("\n" + title)
+    print("-" * len(title))
+    print(f"{'function':<16} {'policy':<14} {'nodes/get':>9} {'us/get':>8}")
+    for name, policy, visits, seconds in rows:
+        print(f"{name:<16} {policy:<14} {visits:>9.3f} {seconds * 1e6:>8.3f}")
+
+
+def bench_batch_hashing(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)) -> list:
+    """
+    Average cost per key of hashing a batch of keys with a loop of scalar
+    hash calls and with hash_many, and of computing their bucket indices
+    with a loop and with hash_indices
+    param sizes: number of keys in the batch
+    return list: rows of (size, label, seconds per key)
+    """
+    rows = []
+    for size in sizes:
+        keys = ['str' + str(i) for i in range(size)]
+
+        for name, function in (('hash_1', hash_function_1),
+                               ('hash_2', hash_function_2),
+                               ('fnv1a', hash_function_fnv1a)):
+            rows.append((size, f'{name} (loop)', _time_per_op(
+                lambda batch: [function(key) for key in batch],
+                [keys]) / size))
+            rows.append((size, f'{name} hash_many', _time_per_op(
+                lambda batch: hash_many(function, batch), [keys]) / size))
+
+        hashes = [hash_function_fnv1a(key) for key in keys]
+        capacity = next_prime(size)
+        rows.append((size, 'index (loop)', _time_per_op(
+            lambda batch: [value % capacity for value in batch],
+            [hashes]) / size))
+        rows.append((size, 'hash_indices', _time_per_op(
+            lambda batch: hash_indices(batch, capacity), [hashes]) / size))
+
+    return rows
+
+
+def bench_find_mode(sizes=(10 ** 5, 10 ** 6), distinct: int = 10 ** 4,
+                    chunk_size: int = 10 ** 5, function='fnv1a') -> list:
+    """
+    Average cost per value of find_mode and top_k over a Zipfian stream of
+    values, read from a generator one value at a time and in chunks. The
+    chunked rows match the others when NumPy is not installed
+    param sizes: number of values in the stream
+    param distinct: number of distinct values
+    param chunk_size: values per numpy.unique call in the chunked rows
+    param function: hash function of the counting map
+    return list: rows of (size, label, seconds per value)
+    """
+    keys = ['/item/' + str(i) for i in range(distinct)]
+    rows = []
+
+    for size in sizes:
+        stream = _zipf_keys(keys, size)
+        for label, chunk in (('', None), (' chunked', chunk_size)):
+            rows.append((size, 'find_mode' + label, _time_per_op(
+                lambda values: hash_map_sc.find_mode(
+                    iter(values), chunk, distinct, function),
+                [stream]) / size))
+            rows.append((size, 'top_k(10)' + label, _time_per_op(
+                lambda values: hash_map_sc.top_k(
+                    iter(values), 10, chunk, distinct, function),
+                [stream]) / size))
+
+    return rows
+
+
+def _run_threads(threads: int, get, put, workload: list) -> float:
+    """
+    Return the wall clock seconds for threads workers of a ThreadPoolExecutor
+    to run an equal share of workload. Each workload entry is (key, value),
+    a get of key if value is None and a put otherwise
+    """
+    def work(share: list) -> None:
+        for key, value in share:
+            if value is None:
+                get(key)
+            else:
+                put(key, value)
+
+    shares = [workload[i::threads] for i in range(threads)]
+    with ThreadPoolExecutor(threads) as pool:
+        start = time.perf_counter()
+        list(pool.map(work, shares))
+        return time.perf_counter() - start
+
+
+def bench_concurrent(threads=(1, 4, 16), size: int = 10 ** 5,
+                     ops: int = 400000, write_ratio: float = 0.1,
+                     function: callable = hash) -> list:
+    """
+    Average wall clock cost per operation of a mixed get/put workload run
+    from several threads at once, on the lock striped map and on the
+    separate chaining map with every call behind one lock. Under the GIL
+    threads take turns, so this shows the cost of locking rather than a
+    parallel speedup
+    param threads: numbers of worker threads
+    param size: number of entries in the map before the workload starts
+    param ops: number of operations shared out between the threads
+    param write_ratio: share of the operations that are puts
+    param function: hash function handed to the maps
+    return list: rows of (threads, label, seconds per operation)
+    """
+    keys = ['str' + str(i) for i in range(size)]
+    rnd = random.Random(0)
+    workload = [(rnd.choice(keys), i if rnd.random() < write_ratio else None)
+                for i in range(ops)]
+    rows = []
+
+    for count in threads:
+        m = hash_map_concurrent.HashMap(size, function)
+        for i, key in enumerate(keys):
+            m.put(key, i)
+        rows.append((count, 'striped',
+                     _run_threads(count, m.get, m.put, workload) / ops))
+
+        m = hash_map_sc.HashMap(size, function)
+        m.put_many((key, i) for i, key in enumerate(keys))
+        lock = threading.Lock()
+
+        def get(key):
+            with lock:
+                return m.get(key)
+
+        def put(key, value):
+            with lock:
+                m.put(key, value)
+
+        rows.append((count, 'sc + one lock',
+                     _run_threads(count, get, put, workload) / ops))
+
+    return rows
+
+
+def bench_sharded(shards=(1, 2, 4, 8), size: int = 10 ** 6,
+                  batch: int = 10 ** 4, function: callable = hash) -> list:
+    """
+    Average cost per key of loading size keys and then reading them back in
+    batches, with the open addressing map in this process and with the
+    sharded map at each number of shards. Throughput can only grow with
+    the shard count up to the number of cores, and the front end still
+    splits and sends every batch from one process
+    param shards: numbers of worker processes
+    param size: number of keys put and then read
+    param batch: keys per put_many/get_many call
+    param function: hash function handed to the maps
+    return list: rows of (shards, label, seconds per key)
+    """
+    keys = ['str' + str(i) for i in range(size)]
+    batches = [keys[i:i + batch] for i in range(0, size, batch)]
+    rows = []
+
+    def load_and_read(m) -> float:
+        start = time.perf_counter()
+        for keyBatch in batches:
+            m.put_many((key, 0) for key in keyBatch)
+        for keyBatch in batches:
+            m.get_many(keyBatch)
+        return (time.perf_counter() - start) / size
+
+    rows.append((0, 'oa in process',
+                 load_and_read(hash_map_oa.HashMap(11, function))))
+    for count in shards:
+        with hash_map_sharded.HashMap(count, function) as m:
+            rows.append((count, 'sharded oa', load_and_read(m)))
+
+    return rows
+
+
+def bench_shared(sizes=(10 ** 4, 10 ** 5, 10 ** 6),
+                 function: str = 'fnv1a') -> list:
+    """
+    Average cost per key of making a table available in a new process,
+    by rebuilding the open addressing map with put or by opening the shared
+    memory table another process built, and of get on each. Opening only
+    reads the header, however large the table
+    param sizes: number of entries in the table
+    param function: name of the hash function, which must be shareable
+    return list: rows of (size, label, seconds per key)
+    """
+    rows = []
+    for size in sizes:
+        keys = ['str' + str(i) for i in range(size)]
+        pairs = [(key, i) for i, key in enumerate(keys)]
+
+        m = hash_map_oa.HashMap(11, function)
+        rows.append((size, 'oa rebuild (put)',
+                     _time_per_op(lambda pair: m.put(*pair), pairs)))
+        rows.append((size, 'oa get', _time_per_op(m.get, keys)))
+
+        start = time.perf_counter()
+        table = hash_map_shared.HashMap.build(pairs, function)
+        rows.append((size, 'shared build',
+                     (time.perf_counter() - start) / size))
+
+        start = time.perf_counter()
+        with hash_map_shared.HashMap(table.name) as opened:
+            rows.append((size, 'shared open',
+                         (time.perf_counter() - start) / size))
+            rows.append((size, 'shared get', _time_per_op(opened.get, keys)))
+
+        table.close()
+        table.unlink()
+
+    return rows
+
+
+def _checked_probe(m: hash_map_oa.HashMap, hash_index: int, key: str,
+                   hash_value: int) -> int:
+    """
+    Reference _quad_probe that reads every bucket through the bounds-checked
+    get_at_index, used as the baseline in bench_probe_cost()
+    """
+    step = 1
+    openIndex = hash_index
+
+    while m._buckets.get_at_index(openIndex):
+        item = m._buckets.get_at_index(openIndex)
+        if item.hash == hash_value and item.key == key:
+            return openIndex
+
+        openIndex = (openIndex + step) % m._capacity
+        step += m._probe_step
+
+    return openIndex
+
+
+def bench_probe_cost(size: int = 10 ** 5, samples: int = 20000,
+                     function='hash_function_2') -> list:
+    """
+    Average cost of one probe step of the open addressing map, reading
+    buckets through get_at_index and through DynamicArray.view(). The
+    default hash function collides often, so lookups take several steps
+    param size: number of entries to load before measuring
+    param samples: number of lookups measured
+    param function: hash function handed to the map
+    return list: rows of (average probes per lookup, label, seconds per probe)
+    """
+    m = hash_map_oa.HashMap(size, function)
+    for i in range(size):
+        m.put('str' + str(i), i)
+
+    step = max(1, size // samples)
+    keys = ['str' + str(i) for i in range(0, size, step)]
+    hashes = [m._hash_function(key) for key in keys]
+    starts = [m._hash_index(hashValue, m.get_capacity())
+              for hashValue in hashes]
+    probes = sum(_probe_length(m, key) for key in keys)
+    lookups = list(range(len(keys)))
+
+    rows = []
+    for label, probe in (('get_at_index', lambda i: _checked_probe(
+                              m, starts[i], keys[i], hashes[i])),
+                         ('view', lambda i: m._quad_probe(
+                              starts[i], keys[i], hashes[i]))):
+        seconds = _time_per_op(probe, lookups) * len(keys) / probes
+        rows.append((round(probes / len(keys), 2), label, seconds))
+
+    return rows
+
+
+# ------------------- BENCHMARKS ------------------------------------------- #
+
+if __name__ == "__main__":
+
+    _report("OA - lookup cost as the map grows", bench_oa_lookup())
+    _report("SC - contains_key/remove, scan vs hashed bucket",
+            bench_sc_lookup())
+    _report("Put latency, full vs incremental resizing", bench_put_latency())
+    _report_distribution(bench_hash_distribution())
+    _report_memory(bench_memory())
+    _report("Batch operations vs a loop of single calls", bench_batch())
+    _report_robin_hood(bench_robin_hood())
+    _report("Read latency, oa vs sc vs cuckoo", bench_read_latency())
+    _report_swiss(bench_swiss())
+    _report("SC - colliding keys, linked list vs sorted chain buckets",
+            bench_treeify())
+    _report_chain_policy(bench_chain_policy())
+    _report("Batch hashing, scalar loop vs hash_many/hash_indices",
+            bench_batch_hashing())
+    _report("find_mode/top_k, one value at a time vs chunked",
+            bench_find_mode())
+    _report("Threads, lock striped map vs sc behind one lock",
+            bench_concurrent())
+    _report("Sharded across processes vs one map in process",
+            bench_sharded())
+    _report("Shared memory table vs rebuilding with put", bench_shared())
+    _report("OA - cost per probe step, checked vs view", bench_probe_cost())
@@ -0,0 +1,407 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Thread-safe hash map using separate chaining, for sharing one
+# map between threads. Buckets and sizing follow hash_map_sc: a prime number
+# of chains, grown to the next prime past twice the capacity once the load
+# factor reaches 1.0. Each chain is an immutable tuple of (key, value, hash)
+# entries that writers replace whole, so get and contains_key read whatever
+# chain is current without taking a lock. Writers lock the stripe covering
+# the bucket they change, one of a fixed number of locks shared out by
+# bucket index, so writers to different stripes don't wait on each other.
+# Resizing takes every stripe, which pauses writers but not readers, who
+# keep reading the old bucket array until the new one is swapped in.
+# Methods:
+# put(): updates the key/value pair in the hash map
+# setdefault(): returns the value at a key, adding a default if missing
+# update_with(): replaces the value at a key with fn(value), atomically
+# resize_table(): changes the capacity of the internal hash table
+# table_load(): calculates and returns the load factor
+# empty_buckets(): returns the number of empty buckets in the table
+# get(): returns a value associated with the given key
+# contains_key(): returns whether or not a key is in the hash map
+# remove(): removes a key/value pair from the hash map
+# get_keys_and_values(): returns a DynamicArray of tuples containing all the
+# key/value pairs in the hash map
+# clear(): clears the hash map
+# __iter__(), keys(), values(), items(): iterate over a snapshot of each
+# chain, without locking
+
+import threading
+
+from a6_include import (DynamicArray, is_prime, next_prime,
+                        get_hash_function, hash_function_1, hash_function_2)
+
+
+class HashMap:
+    # max load factor, the same as hash_map_sc
+    _THRESHOLD = 1.0
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = 16) -> None:
+        """
+        Initialize new thread-safe HashMap that uses separate chaining for
+        collision resolution
+        param function: hash function, or the name of one in
+        a6_include.HASH_FUNCTIONS such as 'fnv1a' or 'xxhash'
+        param stripes: number of locks the buckets are shared out between.
+        Bucket i is covered by lock i % stripes
+        """
+        # capacity must be a prime number
+        self._buckets = DynamicArray([()] * next_prime(capacity))
+        self._hash_function = get_hash_function(function)
+
+        # entries in the buckets covered by each stripe, changed only by the
+        # holder of that stripe's lock
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._counts = [0] * stripes
+
+    def __str__(self) -> str:
+        """
+        Return content of hash map in human-readable form
+        """
+        out = ''
+        for i, chain in enumerate(self._buckets.view()):
+            out += str(i) + ': ' + str(chain) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map. While other threads are writing it may be off by
+        the writes in progress
+        """
+        return sum(self._counts)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._buckets.length()
+
+    # ------------------------------------------------------------------ #
+
+    def _lock_chain(self, hash_value: int) -> tuple:
+        """
+        helper method to take the lock of the stripe covering the bucket of
+        hash_value. If a resize swaps in a new bucket array while waiting,
+        the lock is let go and taken again for the new array
+        return : (buckets, bucket list, hashKey, stripe), with the stripe's
+        lock held by the caller
+        """
+        while True:
+            buckets = self._buckets
+            chains = buckets.view()
+            hashKey = hash_value % len(chains)
+            stripe = hashKey % len(self._locks)
+
+            self._locks[stripe].acquire()
+            if self._buckets is buckets:
+                return buckets, chains, hashKey, stripe
+            self._locks[stripe].release()
+
+    @staticmethod
+    def _position(chain: tuple, key: str, hash_value: int) -> int:
+        """
+        helper method to return the position of key in chain, or -1 if it is
+        not there
+        """
+        for position, (itemKey, _, itemHash) in enumerate(chain):
+            if itemHash == hash_value and itemKey == key:
+                return position
+        return -1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        updates the key/value pair in the hash map. If key already exists in
+        the hash map, its associated value is replaced with the new value.
+        If key is NOT in the hash map, a new key/value pair is added.
+        param key: key to be added
+        param value: value to be added at key
+        return : None
+        """
+        self.update_with(key, lambda _: value)
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        returns the value associated with key. If key is NOT in the hash
+        map, a new key/value pair is added with default as its value.
+        param key: search target
+        param default: value to add at key if key is not found
+        return : the value at key after the call
+        """
+        return self.update_with(key, lambda value: value, default)
+
+    def update_with(self, key: str, fn: callable,
+                    default: object = None) -> object:
+        """
+        replaces the value associated with key with fn(value). If key is NOT
+        in the hash map, a new key/value pair is added with fn(default) as
+        its value. No other thread can change key in between, so
+        update_with(key, lambda v: v + 1, 0) counts occurrences of key from
+        any number of threads. fn runs with a stripe locked, so it must not
+        use the hash map itself.
+        param key: key to be updated
+        param fn: callable taking the current value and returning the new one
+        param default: value handed to fn if key is not found
+        return : the new value at key
+        """
+        hashValue = self._hash_function(key)
+        buckets, chains, hashKey, stripe = self._lock_chain(hashValue)
+
+        try:
+            chain = chains[hashKey]
+            position = self._position(chain, key, hashValue)
+
+            # the chain is copied with the change and swapped in, readers
+            # see either the old or the new copy
+            if position < 0:
+                value = fn(default)
+                chains[hashKey] = ((key, value, hashValue),) + chain
+                self._counts[stripe] += 1
+            else:
+                value = fn(chain[position][1])
+                chains[hashKey] = (chain[:position] +
+                                   ((key, value, hashValue),) +
+                                   chain[position + 1:])
+        finally:
+            self._locks[stripe].release()
+
+        # resize if load factor reached the threshold
+        if position < 0 and \
+                self.get_size()/len(chains) >= self._THRESHOLD:
+            self._grow(buckets)
+
+        return value
+
+    def _grow(self, buckets: DynamicArray) -> None:
+        """
+        helper method to double the capacity of buckets, unless another
+        thread has already replaced it or the table is no longer full
+        """
+        self._acquire_all()
+        try:
+            capacity = buckets.length()
+            if self._buckets is buckets and \
+                    sum(self._counts)/capacity >= self._THRESHOLD:
+                self._rehash(next_prime(capacity*2))
+        finally:
+            self._release_all()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table. All existing
+        key/value pairs must remain in the new hash map, and all hash table
+        links must be rehashed.
+        param new_capacity: capacity of new hash map
+        """
+        # check if new capacity is valid (> 1)
+        if new_capacity < 1:
+            return
+
+        # make sure new capacity is prime
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+
+        self._acquire_all()
+        try:
+            # entries are moved once into a table big enough to hold them
+            # all, growing the same way a run of puts would
+            size = sum(self._counts)
+            while (size - 1)/new_capacity >= self._THRESHOLD:
+                new_capacity = next_prime(new_capacity*2)
+
+            self._rehash(new_capacity)
+        finally:
+            self._release_all()
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        helper method to move every entry into a new bucket array of
+        new_capacity and swap it in. Called with every stripe locked, so
+        only readers run meanwhile, and they keep reading the old array
+        param new_capacity: capacity of the new bucket array
+        """
+        stripes = len(self._locks)
+        lists = [None] * new_capacity
+        counts = [0] * stripes
+
+        for chain in self._buckets.view():
+            for item in chain:
+                hashKey = item[2] % new_capacity
+                if lists[hashKey] is None:
+                    lists[hashKey] = [item]
+                else:
+                    lists[hashKey].append(item)
+                counts[hashKey % stripes] += 1
+
+        self._buckets = DynamicArray(
+            [() if items is None else tuple(items) for items in lists])
+        self._counts = counts
+
+    def _acquire_all(self) -> None:
+        """
+        helper method to take every stripe's lock, always in the same order
+        """
+        for lock in self._locks:
+            lock.acquire()
+
+    def _release_all(self) -> None:
+        """
+        helper method to let go of every stripe's lock
+        """
+        for lock in reversed(self._locks):
+            lock.release()
+
+    def table_load(self) -> float:
+        """
+        calculates and returns the load factor
+        return : load factor of the hash table
+        """
+        return self.get_size()/self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        returns the number of empty buckets in the hash table
+        return : number of empty buckets
+        """
+        return self._buckets.view().count(())
+
+    def _find(self, key: str) -> tuple:
+        """
+        helper method to return the (key, value, hash) entry holding key, or
+        None. Reads the current chain without locking
+        """
+        hashValue = self._hash_function(key)
+        chains = self._buckets.view()
+
+        for item in chains[hashValue % len(chains)]:
+            if item[2] == hashValue and item[0] == key:
+                return item
+        return None
+
+    def get(self, key: str):
+        """
+        returns a value associated with the given key.
+        param key: search target
+        returns : key's value if found else None
+        """
+        item = self._find(key)
+        if item is None:
+            return None
+
+        return item[1]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        searches for the arg key and returns a boolean
+        param key: search target
+        returns : True if found else False
+        """
+        return self._find(key) is not None
+
+    def remove(self, key: str) -> bool:
+        """
+        searches for arg key and removes it if found
+        param key: search target
+        returns : True if a key/value pair was removed else False
+        """
+        hashValue = self._hash_function(key)
+        _, chains, hashKey, stripe = self._lock_chain(hashValue)
+
+        try:
+            chain = chains[hashKey]
+            position = self._position(chain, key, hashValue)
+            if position < 0:
+                return False
+
+            chains[hashKey] = chain[:position] + chain[position + 1:]
+            self._counts[stripe] -= 1
+            return True
+        finally:
+            self._locks[stripe].release()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        returns a DynamicArray where each index contains a tuple of a
+        key/value pair stored in the hash map
+        return : DynamicArray of tuples(key, value)
+        """
+        return DynamicArray(list(self.items()))
+
+    def clear(self) -> None:
+        """
+        clears the hash map
+        """
+        self._acquire_all()
+        try:
+            self._buckets = DynamicArray([()] * self._buckets.length())
+            self._counts = [0] * len(self._locks)
+        finally:
+            self._release_all()
+
+    def __iter__(self):
+        """
+        Enables iteration over the keys of the hashmap
+        """
+        return self.keys()
+
+    def items(self):
+        """
+        Iterate over (key, value) tuples in the hashmap. Each chain is read
+        as it is when reached, so writes from other threads may or may not
+        show up, but iteration never fails because of them
+        """
+        for chain in self._buckets.view():
+            for key, value, _ in chain:
+                yield key, value
+
+    def keys(self):
+        """
+        Iterate over the keys in the hashmap, see items
+        """
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """
+        Iterate over the values in the hashmap, see items
+        """
+        for _, value in self.items():
+            yield value
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput example")
+    print("-----------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nget/remove example")
+    print("------------------")
+    m = HashMap(151, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    m.remove('207')
+    print(m.get_size(), m.get_capacity())
+    for i in range(200, 300, 21):
+        print(i, m.get(str(i)), m.contains_key(str(i)))
+
+    print("\nthreaded update_with example")
+    print("----------------------------")
+    from concurrent.futures import ThreadPoolExecutor
+    m = HashMap(11, hash_function_2)
+
+    def count_words(offset: int) -> None:
+        for i in range(2000):
+            m.update_with('word' + str((i + offset) % 100), lambda v: v + 1, 0)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(count_words, range(8)))
+    print(m.get_size(), m.get('word7'), sum(m.values()))
@@ -0,0 +1,430 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Hash map using cuckoo hashing for collision resolution. Every
+# key has exactly two candidate indices, taken from the two halves of a
+# seeded XXH64 hash of the key itself, so a lookup reads at most two indices
+# plus a stash of at most _STASH_SIZE entries. The map's own hash function
+# is only stored with each entry and compared before the key, so keys it
+# hashes alike still get unrelated indices. put moves entries between their
+# two indices to make room, up to a fixed number of evictions. An entry left
+# over after that goes to the stash, and when the stash is full the table
+# is rebuilt with a new seed, or a larger capacity if reseeding keeps
+# failing.
+# Methods:
+# put() - adds or updates a new key/value pair to the hash map.
+# resize_table() - resizes the hash table to passed in new capacity.
+# table_load() - returns the current load factor of the hash table.
+# empty_buckets() - returns the number of empty buckets in the hash table.
+# get() - returns the value associated with the given key.
+# contains_key() - returns whether or not a key is in the hash table.
+# remove() - removes the key/value pair associated with the given key.
+# get_keys_and_values() - returns a dynamic array of all keys and values in the hash table.
+# clear() - clears all contents of the hash table without changing the underlying hash table capacity.
+# __iter__() - iterates over the entries of the hash map and its stash.
+# keys(), values(), items() - iterate over the keys, values or key/value
+# pairs of the hash map.
+
+from a6_include import (DynamicArray, HashEntry, is_prime, next_prime,
+                        get_hash_function, hash_function_xxhash,
+                        hash_function_1, hash_function_2)
+
+
+# the two indices come from the low and high 32 bits of the index hash
+_MASK_32 = 0xFFFFFFFF
+
+
+class HashMap:
+    # max load factor, two choice cuckoo tables fail often much past 0.5
+    _THRESHOLD = 0.4
+
+    # max number of entries moved by a single put before giving up and
+    # using the stash
+    _MAX_EVICTIONS = 32
+
+    # entries that fit at neither index. Scanned by every missed lookup, so
+    # kept small
+    _STASH_SIZE = 4
+
+    # rebuilds with new seeds at the same capacity before growing instead
+    _MAX_RESEEDS = 4
+
+    def __init__(self, capacity: int, function, seed: int = 0) -> None:
+        """
+        Initialize new HashMap that uses cuckoo hashing for collision
+        resolution
+        param function: hash function, or the name of one in
+        a6_include.HASH_FUNCTIONS such as 'fnv1a' or 'xxhash'. Its hash is
+        compared before keys, the indices don't depend on it
+        param seed: starting seed for the index hash
+        """
+        # capacity must be a prime number
+        self._capacity = next_prime(capacity)
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._stash = []
+
+        self._hash_function = get_hash_function(function)
+        self._seed = seed
+        self._size = 0
+        self._version = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        for item in self._stash:
+            out += 'stash: ' + str(item) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _indices(key: str, capacity: int, seed: int) -> tuple:
+        """
+        helper method to return the two candidate indices of key in a table
+        of capacity. The halves of a 64 bit hash are independent, so two keys
+        share both indices only if their whole index hashes are equal
+        """
+        indexHash = hash_function_xxhash(key, seed)
+        return ((indexHash & _MASK_32) % capacity,
+                (indexHash >> 32) % capacity)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        This method updates the key/value pair in the hashmap
+        param key: key to be updated
+        param value: value to be updated
+        conditions: if key is already in hashmap, update value @ key with new value
+                    if key is not in hashmap, a new key/value pair is added
+        """
+        hashValue = self._hash_function(key)
+
+        # update key/value pair in place if key is already present
+        item = self._find(key, hashValue)
+        if item is not None:
+            item.value = value
+            return
+
+        if (self._size + 1)/self._capacity > self._THRESHOLD:
+            self.resize_table(self._capacity*2)
+
+        self._insert(HashEntry(key, value, hashValue))
+        self._size += 1
+        self._version += 1
+
+    def _insert(self, item: HashEntry) -> None:
+        """
+        helper method to add an entry whose key is not in the hashmap,
+        rebuilding the table if the stash is already full
+        """
+        leftover = self._place(self._buckets.view(), self._capacity,
+                               self._seed, item)
+        if leftover is None:
+            return
+
+        if len(self._stash) < self._STASH_SIZE:
+            self._stash.append(leftover)
+        else:
+            self._rebuild(self._capacity, [leftover])
+
+    def _place(self, slots: list, capacity: int, seed: int,
+               item: HashEntry) -> object:
+        """
+        helper method to put item at one of its two indices, evicting the
+        entry there to its other index and so on, for at most
+        _MAX_EVICTIONS moves
+        param slots: bucket list, from DynamicArray.view()
+        param seed: seed of the index hash
+        return : None if every entry found a place, or else the entry left
+        without one
+        """
+        first, second = self._indices(item.key, capacity, seed)
+        if slots[first] is None:
+            slots[first] = item
+            return None
+        if slots[second] is None:
+            slots[second] = item
+            return None
+
+        index = first
+        for _ in range(self._MAX_EVICTIONS):
+            item, slots[index] = slots[index], item
+            if item is None:
+                return None
+
+            # the evicted entry moves to whichever of its indices it wasn't
+            # just pushed out of
+            first, second = self._indices(item.key, capacity, seed)
+            index = second if index == first else first
+
+            if slots[index] is None:
+                slots[index] = item
+                return None
+
+        return item
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change capacity of the internal hash table to new_capacity
+        param new_capacity: new capacity to resize to
+        """
+        # Check if new capacity is greater than current size if not return
+        # without resizing
+        if new_capacity <= self._size:
+            return
+
+        # make sure new capacity is prime
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+
+        # entries are moved once into a table big enough to hold them all
+        while self._size/new_capacity > self._THRESHOLD:
+            new_capacity = next_prime(new_capacity*2)
+
+        if not self._rehash(new_capacity, self._seed, []):
+            self._rebuild(new_capacity, [])
+
+    def _rebuild(self, capacity: int, extra: list) -> None:
+        """
+        helper method to rehash every entry plus the entries in extra with
+        new seeds until the leftovers fit in the stash. After every
+        _MAX_RESEEDS failed seeds the capacity is doubled
+        param capacity: capacity to try first
+        param extra: entries not yet in the table or the stash
+        """
+        seed = self._seed
+        attempts = 0
+
+        while True:
+            seed += 1
+            attempts += 1
+            if self._rehash(capacity, seed, extra):
+                return
+
+            if attempts % self._MAX_RESEEDS == 0:
+                capacity = next_prime(capacity*2)
+
+    def _rehash(self, new_capacity: int, seed: int, extra: list) -> bool:
+        """
+        helper method to move every entry, stashed ones included, and the
+        entries in extra into a new bucket array of new_capacity using the
+        index hash for seed. The table is only replaced if the entries that
+        don't fit at either index fit in the stash
+        param new_capacity: capacity of the new bucket array
+        param seed: seed for the index hash of the new table
+        param extra: entries not yet in the table or the stash
+        return : True if the table was replaced
+        """
+        slots = [None] * new_capacity
+        stash = []
+
+        for item in list(self._iter_entries()) + extra:
+            leftover = self._place(slots, new_capacity, seed, item)
+            if leftover is not None:
+                if len(stash) == self._STASH_SIZE:
+                    return False
+                stash.append(leftover)
+
+        self._seed = seed
+        self._capacity = new_capacity
+        self._buckets = DynamicArray(slots)
+        self._stash = stash
+        self._version += 1
+        return True
+
+    def table_load(self) -> float:
+        """
+        Calculate and return load factor
+        load factor(lambda) = n(number of elements)/m(number of buckets)
+        return float: load factor
+        """
+        return self._size/self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty buckets.
+        return int: number of empty buckets
+        """
+        return self._capacity - self._size + len(self._stash)
+
+    def _find(self, key: str, hash_value: int) -> HashEntry:
+        """
+        helper method to return the entry holding key. Reads its two
+        candidate indices and then the stash
+        param key: key user is searching for
+        param hash_value: hash of key
+        return HashEntry: entry holding key, or None if key is not present
+        """
+        slots = self._buckets.view()
+        first, second = self._indices(key, self._capacity, self._seed)
+
+        for item in (slots[first], slots[second]):
+            if item is not None and item.hash == hash_value \
+                    and item.key == key:
+                return item
+
+        for item in self._stash:
+            if item.hash == hash_value and item.key == key:
+                return item
+
+        return None
+
+    def get(self, key: str) -> object:
+        """
+        Get value associated with key
+        param key: key user is searching for
+        return object: target key's value
+        """
+        item = self._find(key, self._hash_function(key))
+        if item is None:
+            return None
+
+        return item.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Check if key is in hashmap
+        param key: key user is searching for
+        return bool: True if key is found else False
+        """
+        return self._find(key, self._hash_function(key)) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Searches for and removes target key from hashmap
+        param key: key user wishes to remove
+        """
+        hashValue = self._hash_function(key)
+        item = self._find(key, hashValue)
+        if item is None:
+            return
+
+        # every key has a fixed pair of indices, so clearing the index
+        # needs no tombstone
+        slots = self._buckets.view()
+        first, second = self._indices(key, self._capacity, self._seed)
+        if slots[first] is item:
+            slots[first] = None
+        elif slots[second] is item:
+            slots[second] = None
+        else:
+            self._stash.remove(item)
+
+        self._size -= 1
+        self._version += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray that contains all keys and values in a hashmap
+        return DynamicArray: DynamicArray, contains tuples of key and value
+        """
+        tupleArr = DynamicArray()
+
+        for pair in self.items():
+            tupleArr.append(pair)
+
+        return tupleArr
+
+    def clear(self) -> None:
+        """
+        Clears all contents of the hashmap without changing underlying hash
+        table capacity
+        """
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._stash = []
+        self._size = 0
+        self._version += 1
+
+    def _iter_entries(self):
+        """
+        Generator over the entries in the table and the stash. Raises
+        RuntimeError if keys are added or removed while iterating
+        """
+        version = self._version
+
+        for item in self._buckets.view() + self._stash:
+            if self._version != version:
+                raise RuntimeError("HashMap changed size during iteration")
+
+            if item is not None:
+                yield item
+
+        if self._version != version:
+            raise RuntimeError("HashMap changed size during iteration")
+
+    def __iter__(self):
+        """
+        Enables iteration over the entries of the hashmap and its stash,
+        like hash_map_oa.HashMap. Each call returns a new iterator
+        """
+        return self._iter_entries()
+
+    def keys(self):
+        """
+        Iterate over the keys in the hashmap without copying them
+        """
+        for item in self._iter_entries():
+            yield item.key
+
+    def values(self):
+        """
+        Iterate over the values in the hashmap without copying them
+        """
+        for item in self._iter_entries():
+            yield item.value
+
+    def items(self):
+        """
+        Iterate over (key, value) tuples in the hashmap without copying them
+        """
+        for item in self._iter_entries():
+            yield item.key, item.value
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput example")
+    print("-----------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(round(m.table_load(), 2), m.get_size(), m.get_capacity(),
+                  len(m._stash))
+
+    print("\nanagram example")
+    print("---------------")
+    # hash_function_1 gives every anagram the same hash, but the indices
+    # come from the index hash of the key itself
+    from itertools import permutations
+    m = HashMap(11, hash_function_1)
+    words = [''.join(p) for p in permutations('abcde')]
+    for i, word in enumerate(words):
+        m.put(word, i)
+    print(m.get_size(), m.get_capacity(), len(m._stash))
+    for word in words[:3]:
+        print(word, m._indices(word, m.get_capacity(), m._seed), m.get(word))
+
+    print("\nremove example")
+    print("--------------")
+    m = HashMap(151, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    m.remove('207')
+    print(m.get_size(), m.get('207'), m.contains_key('214'))
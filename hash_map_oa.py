@@ -17,29 +17,99 @@
 # remove() - removes the key/value pair associated with the given key.
 # get_keys_and_values() - returns a dynamic array of all keys and values in the hash table.
 # clear() - clears all contents of the hash table without changing the underlying hash table capacity.
-# __iter__(), __next__()
-# methods to enable iteration over the hash map.
+# memory_usage() - reports the bytes used by buckets, entries and keys.
+# put_many(), get_many(), remove_many() - batch versions of put, get and
+# remove that hash the whole batch in one pass.
+# reserve() - grows the table once to hold a given number of entries.
+# from_items() - builds a hash map from key/value pairs without resizing.
+# Robin Hood mode (robin_hood=True) - linear probing with displacement
+# ordered insertion and backward shift deletion, at up to 0.85 load.
+# __iter__() - iterates over the live entries of the hash map.
+# keys(), values(), items() - iterate over the keys, values or key/value
+# pairs of the hash map.
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
-                        hash_function_1, hash_function_2)
+import math
+import sys
+
+from a6_include import (DynamicArray, HashEntry, SlottedHashEntry, is_prime,
+                        next_prime, next_power_of_two, get_hash_function,
+                        object_size, hash_many, hash_function_1,
+                        hash_function_2)
+
+
+# left behind in the old table when an entry is migrated so that probe
+# sequences through that index keep going during an incremental resize
+_MOVED = HashEntry(None, None)
+_MOVED.is_tombstone = True
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    # max number of live entries moved per operation while resizing
+    # incrementally, up to 10 times as many indices are visited
+    _MIGRATE_STEP = 4
+
+    # max load factor, Robin Hood probe lengths stay short at higher loads
+    _THRESHOLD = 0.5
+    _ROBIN_HOOD_THRESHOLD = 0.85
+
+    def __init__(self, capacity: int, function,
+                 incremental: bool = False,
+                 power_of_two: bool = False,
+                 slots: bool = False,
+                 robin_hood: bool = False) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        param function: hash function, or the name of one in
+        a6_include.HASH_FUNCTIONS such as 'fnv1a' or 'xxhash'
+        param incremental: if True, growing the table moves entries a few at
+        a time on later operations instead of all at once in a single put
+        param power_of_two: if True, capacity is kept a power of two and
+        indices are found with a bit mask. Only suited to hash functions
+        whose low bits are well mixed
+        param slots: if True, entries are SlottedHashEntry objects, which
+        have no per-instance __dict__
+        param robin_hood: if True, entries are placed with Robin Hood linear
+        probing and removed by backward shifting, so there are no tombstones
+        and the table can run at a load factor of up to 0.85. Can't be
+        combined with incremental
         """
-        self._buckets = DynamicArray()
+        if robin_hood and incremental:
+            raise ValueError("robin_hood can't be combined with incremental")
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        # capacity must be a prime number, or a power of two in mask mode
+        self._power_of_two = power_of_two
+        if power_of_two:
+            self._capacity = next_power_of_two(capacity)
+        else:
+            self._capacity = self._next_prime(capacity)
+
+        # quadratic offsets 1, 4, 9, ... are built up by adding 1, 3, 5, ...
+        # With a power of two capacity they would skip most indices, so
+        # triangular offsets 1, 3, 6, ... (adding 1, 2, 3, ...) are used,
+        # which visit every index
+        self._probe_step = 1 if power_of_two else 2
 
-        self._hash_function = function
+        self._robin_hood = robin_hood
+        self._threshold = (self._ROBIN_HOOD_THRESHOLD if robin_hood
+                           else self._THRESHOLD)
+        self._buckets = DynamicArray([None] * self._capacity)
+
+        self._hash_function = get_hash_function(function)
         self._size = 0
+        self._entry_class = SlottedHashEntry if slots else HashEntry
+
+        # removed entries still occupy their index until the next rebuild
+        self._tombstones = 0
+
+        # bumped whenever keys are added or removed, lets iterators fail fast
+        self._version = 0
+
+        # table being migrated from during an incremental resize
+        self._incremental = incremental
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
 
     def __str__(self) -> str:
         """
@@ -53,36 +123,18 @@ class HashMap:
 
     def _next_prime(self, capacity: int) -> int:
         """
-        Increment from given number to find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Increment from given number to find the closest prime number,
+        found by binary search in a table of small primes or by
+        Miller-Rabin tests for larger capacities
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
-
-        if capacity == 1 or capacity % 2 == 0:
-            return False
-
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
-
-        return True
+        return is_prime(capacity)
 
     def get_size(self) -> int:
         """
@@ -109,45 +161,299 @@ class HashMap:
                     if key is not in hashmap, a new key/value pair is added
 
         """
-        threshold = 0.5
+        threshold = self._threshold
+
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_STEP)
+
+        # tombstones lengthen probe sequences just like live entries, so
+        # both count towards the threshold. If most occupied indices are
+        # tombstones, rebuild at the same capacity instead of growing
+        if (self._size + self._tombstones)/self._capacity > threshold:
+            self._finish_migration()
 
-        # resize if load factor is greater than threshold
-        if self.table_load() > threshold:
-            self.resize_table(self._capacity*2)
+            if self._tombstones > self._size:
+                self._compact()
+            elif self._incremental:
+                self._start_migration(self._grow_capacity(self._capacity))
+            else:
+                self.resize_table(self._capacity*2)
+
+        self._insert(key, value, self._hash_function(key))
+
+    def _insert(self, key: str, value: object, hash_value: int) -> None:
+        """
+        helper method for put and put_many to add or update key once the
+        table has room for it
+        param hash_value: hash of key
+        """
+        if self._robin_hood:
+            self._robin_hood_insert(key, value, hash_value)
+            return
 
         # get the starting index using hash function and probe open index
-        hashIndex = self._hash_function(key) % self._capacity
-        target = self._quad_probe(hashIndex, key)
+        target = self._quad_probe(
+            self._hash_index(hash_value, self._capacity), key, hash_value)
 
         # Insert key/value pair if target index is empty or tombstone(removed)
-        if self._buckets.get_at_index(target) is None or \
-                self._buckets.get_at_index(target).is_tombstone:
-            self._buckets.set_at_index(target, HashEntry(key, value))
+        slots = self._buckets.view()
+        current = slots[target]
+        if current is None or current.is_tombstone:
+
+            # key may still be waiting to be migrated, update it in place
+            if self._old_buckets is not None:
+                oldIndex = self._find_live(self._old_buckets,
+                                           self._old_capacity, hash_value, key)
+                if oldIndex is not None:
+                    self._old_buckets.view()[oldIndex] = self._entry_class(
+                        key, value, hash_value)
+                    return
+
+            slots[target] = self._entry_class(key, value, hash_value)
             self._size += 1
+            self._version += 1
 
-            # if tombstone, set to False to indicate index is no longer removed
-            if self._buckets.get_at_index(target).is_tombstone:
-                self._buckets.get_at_index(target).is_tombstone = False
+            # a reused tombstone no longer counts as removed
+            if current is not None:
+                self._tombstones -= 1
 
         else:
             # update key/value pair at the target index
-            self._buckets.set_at_index(target, HashEntry(key, value))
+            slots[target] = self._entry_class(key, value, hash_value)
+
+    def _robin_hood_insert(self, key: str, value: object,
+                           hash_value: int) -> None:
+        """
+        helper method to add or update key in Robin Hood mode. Probing is
+        linear, and each entry's displacement (distance from its home index)
+        is worked out from its cached hash. Entries along a probe sequence
+        are kept in order of displacement, so the search for key can stop
+        at the first entry that is closer to home than key would be
+        param hash_value: hash of key
+        """
+        slots, capacity = self._buckets.view(), self._capacity
+        index = self._hash_index(hash_value, capacity)
+        distance = 0
+
+        while True:
+            item = slots[index]
+            if item is None or self._displacement(item, index) < distance:
+                break
+
+            # update key/value pair at the target index
+            if item.hash == hash_value and item.key == key:
+                slots[index] = self._entry_class(key, value, hash_value)
+                return
+
+            index = (index + 1) % capacity
+            distance += 1
+
+        self._displace(slots, capacity, index, distance,
+                       self._entry_class(key, value, hash_value))
+        self._size += 1
+        self._version += 1
+
+    def _displacement(self, item: HashEntry, index: int) -> int:
+        """
+        helper method to return how far index is past item's home index
+        """
+        return (index - self._hash_index(item.hash, self._capacity)) \
+            % self._capacity
+
+    def _displace(self, slots: list, capacity: int, index: int,
+                  distance: int, item: HashEntry) -> None:
+        """
+        helper method to put item, whose key is not in slots, at index in
+        Robin Hood mode. Whenever item is further from home than the entry
+        it meets, they swap and the displaced entry carries on probing
+        param slots: bucket list, from DynamicArray.view()
+        param distance: item's displacement at index
+        """
+        while True:
+            current = slots[index]
+            if current is None:
+                slots[index] = item
+                return
+
+            # take from the rich (near home), give to the poor
+            currentDistance = (index - self._hash_index(current.hash,
+                                                        capacity)) % capacity
+            if currentDistance < distance:
+                slots[index], item = item, current
+                distance = currentDistance
+
+            index = (index + 1) % capacity
+            distance += 1
+
+    def _backward_shift(self, index: int) -> None:
+        """
+        helper method to empty index in Robin Hood mode. The entries after
+        it are shifted back one index each, up to the next empty index or
+        entry already at its home index, so no tombstone is needed
+        param index: index of the entry being removed
+        """
+        slots, capacity = self._buckets.view(), self._capacity
+        nextIndex = (index + 1) % capacity
+
+        while (slots[nextIndex] is not None and
+               self._displacement(slots[nextIndex], nextIndex) > 0):
+            slots[index] = slots[nextIndex]
+            index = nextIndex
+            nextIndex = (nextIndex + 1) % capacity
+
+        slots[index] = None
 
-    def _quad_probe(self, hash_index: int, key: str) -> int:
+    def _remove_at(self, buckets: DynamicArray, index: int) -> None:
         """
-        helper method to probe for an open index using quadratic probing
+        helper method for remove and remove_many to remove the live entry at
+        index in buckets, by tombstoning it or, in Robin Hood mode, by
+        shifting the entries after it back
         """
-        offset = 1
+        if self._robin_hood:
+            self._backward_shift(index)
+        else:
+            buckets.view()[index].is_tombstone = True
+
+            # the old table is thrown away, only count current tombstones
+            if buckets is self._buckets:
+                self._tombstones += 1
+
+        self._size -= 1
+        self._version += 1
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds or updates every key/value pair in pairs. The table is grown at
+        most once, up front, and the whole batch is hashed in one pass
+        param pairs: iterable of (key, value) tuples
+        """
+        pairs = list(pairs)
+        hashes = hash_many(self._hash_function, [key for key, _ in pairs])
+
+        self._presize(self._size + len(pairs), amortized=True)
+        for (key, value), hashValue in zip(pairs, hashes):
+            self._insert(key, value, hashValue)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Get the value associated with each key in keys
+        param keys: iterable of keys
+        return DynamicArray: values in the same order as keys, None for any
+        key that is not present
+        """
+        keys = list(keys)
+        hashes = hash_many(self._hash_function, keys)
+        self._finish_migration()
+
+        values = []
+        slots, capacity = self._buckets.view(), self._capacity
+        for key, hashValue in zip(keys, hashes):
+            target = self._find_live(self._buckets, capacity, hashValue, key)
+            values.append(None if target is None else slots[target].value)
+
+        return DynamicArray(values)
+
+    def remove_many(self, keys) -> int:
+        """
+        Removes every key in keys that is in the hashmap
+        param keys: iterable of keys
+        return int: number of key/value pairs removed
+        """
+        keys = list(keys)
+        hashes = hash_many(self._hash_function, keys)
+        self._finish_migration()
+
+        removed = 0
+        for key, hashValue in zip(keys, hashes):
+            target = self._find_live(self._buckets, self._capacity,
+                                     hashValue, key)
+            if target is not None:
+                self._remove_at(self._buckets, target)
+                removed += 1
+
+        return removed
+
+    @classmethod
+    def from_items(cls, items, function, **options) -> 'HashMap':
+        """
+        Build a new HashMap holding every key/value pair in items. The bucket
+        array is created at its final capacity, so no resizes happen
+        param items: iterable of (key, value) tuples
+        param function: hash function, or the name of one
+        param options: incremental, power_of_two, slots or robin_hood, as
+        for __init__
+        return HashMap: the new hashmap
+        """
+        items = list(items)
+        threshold = (cls._ROBIN_HOOD_THRESHOLD if options.get('robin_hood')
+                     else cls._THRESHOLD)
+        hashMap = cls(max(1, cls._reserve_capacity(len(items), threshold)),
+                      function, **options)
+        hashMap.put_many(items)
+        return hashMap
+
+    def reserve(self, count: int) -> None:
+        """
+        Grow the table once so that count entries fit under the load factor
+        threshold (0.5, or 0.85 in Robin Hood mode), so the puts that follow
+        never resize. Never shrinks the table
+        param count: number of entries the hashmap must hold
+        """
+        self._presize(count)
+
+    @staticmethod
+    def _reserve_capacity(count: int, threshold: float) -> int:
+        """
+        helper method to return the smallest table size that holds count
+        entries at a load factor of at most threshold, before rounding up
+        to a valid capacity
+        """
+        return math.ceil(count / threshold)
+
+    def _presize(self, count: int, amortized: bool = False) -> None:
+        """
+        helper method to grow the table once so that count entries fit
+        under the load factor threshold without any further resizes.
+        Tombstones are dropped if that is enough to make room
+        param count: number of live entries the table must hold
+        param amortized: if True, growing at least doubles the capacity like
+        a single put, so a stream of put_many batches resizes only a
+        logarithmic number of times. reserve keeps the exact size
+        """
+        self._finish_migration()
+
+        if (count + self._tombstones)/self._capacity <= self._threshold:
+            return
+
+        newCapacity = self._reserve_capacity(count, self._threshold)
+        if amortized and newCapacity > self._capacity:
+            newCapacity = max(newCapacity, self._capacity*2)
+        self._rehash(max(self._capacity, self._fit_capacity(newCapacity)))
+
+    def _quad_probe(self, hash_index: int, key: str,
+                    hash_value: int) -> int:
+        """
+        helper method to probe for an open index using quadratic probing.
+        Keys are only compared on entries whose cached hash matches
+        """
+        step = 1
         openIndex = hash_index
+        capacity, probeStep = self._capacity, self._probe_step
+
+        # indices are always reduced mod capacity, so the bucket list is
+        # read directly instead of through the bounds-checked accessors
+        slots = self._buckets.view()
 
         # probe until an available spot is found
-        while self._buckets.get_at_index(openIndex):
-            if self._buckets.get_at_index(openIndex).key == key:
+        item = slots[openIndex]
+        while item is not None:
+            if item.hash == hash_value and item.key == key:
                 return openIndex
 
             # update target index using quadratic probing
-            openIndex = (hash_index + offset ** 2) % self._capacity
-            offset += 1
+            openIndex = (openIndex + step) % capacity
+            step += probeStep
+            item = slots[openIndex]
 
         # return valid index to insert a key/value pair
         return openIndex
@@ -164,24 +470,141 @@ class HashMap:
             return
 
         # make sure new capacity is prime
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
+        new_capacity = self._fit_capacity(new_capacity)
+
+        # entries are moved once into a table big enough to hold them all,
+        # growing the same way a run of puts into the new table would
+        while (self._size - 1)/new_capacity > self._threshold:
+            new_capacity = self._grow_capacity(new_capacity)
 
-        # new table with updated capacity
-        resizedTable = HashMap(new_capacity, self._hash_function)
+        self._rehash(new_capacity)
 
-        if new_capacity == 2:
-            resizedTable._capacity = 2
+    def _fit_capacity(self, capacity: int) -> int:
+        """
+        helper method to round a requested capacity up to the nearest valid
+        one, a prime or a power of two in mask mode
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+
+        if not self._is_prime(capacity):
+            capacity = self._next_prime(capacity)
+        return capacity
+
+    def _grow_capacity(self, capacity: int) -> int:
+        """
+        helper method to return the capacity the table grows to from capacity
+        """
+        return self._fit_capacity(capacity*2)
+
+    def _hash_index(self, hash_value: int, capacity: int) -> int:
+        """
+        helper method to map a hash to its first index in a table of
+        capacity, masking off the low bits in power of two mode
+        """
+        if self._power_of_two:
+            return hash_value & (capacity - 1)
+        return hash_value % capacity
+
+    def _compact(self) -> None:
+        """
+        helper method to rebuild the table at the same capacity, dropping
+        all tombstones so probe sequences only pass over live entries
+        """
+        self._rehash(self._capacity)
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        helper method to move every live HashEntry into a new bucket array
+        of new_capacity. Keys are unique, so each entry goes to the first
+        empty index of its probe sequence without duplicate checks or
+        threshold checks
+        param new_capacity: capacity of the new bucket array
+        """
+        newBuckets = DynamicArray([None] * new_capacity)
 
-        # iterate through and rehash items from old table to new table
         for item in self:
-            if item:
-                resizedTable.put(item.key, item.value)
+            self._place(newBuckets, new_capacity,
+                        item.hash, item)
 
         # update data
-        self._buckets = resizedTable._buckets
-        self._size = resizedTable._size
-        self._capacity = resizedTable.get_capacity()
+        self._buckets = newBuckets
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._version += 1
+
+    def _place(self, buckets: DynamicArray, capacity: int, hash_value: int,
+               item: HashEntry) -> None:
+        """
+        helper method to put an entry whose key is not in buckets at the
+        first empty index of its probe sequence
+        """
+        if self._robin_hood:
+            self._displace(buckets.view(), capacity,
+                           self._hash_index(hash_value, capacity), 0, item)
+            return
+
+        index = self._hash_index(hash_value, capacity)
+        step, probeStep = 1, self._probe_step
+        slots = buckets.view()
+
+        while slots[index] is not None:
+            index = (index + step) % capacity
+            step += probeStep
+
+        slots[index] = item
+
+    def _start_migration(self, new_capacity: int) -> None:
+        """
+        helper method to begin an incremental resize. The current table is
+        kept as the old table and an empty table of new_capacity takes its
+        place. Entries move over a few at a time in _migrate
+        param new_capacity: capacity of the new table
+        """
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrate_index = 0
+
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._capacity = new_capacity
+
+        # tombstones stay behind in the old table
+        self._tombstones = 0
+        self._version += 1
+
+    def _migrate(self, limit: int) -> None:
+        """
+        helper method to move up to limit live entries from the old table to
+        the current one, visiting at most 10 * limit indices. The old table
+        is dropped once every index has been visited
+        param limit: max number of entries to move
+        """
+        oldSlots = self._old_buckets.view()
+        end = len(oldSlots)
+        index = self._migrate_index
+        stop = min(end, index + limit * 10)
+        moved = 0
+
+        while index < stop and moved < limit:
+            item = oldSlots[index]
+            if item is not None and not item.is_tombstone:
+                self._place(self._buckets, self._capacity,
+                            item.hash, item)
+                oldSlots[index] = _MOVED
+                moved += 1
+            index += 1
+
+        self._migrate_index = index
+        if index >= end:
+            self._old_buckets = None
+            self._old_capacity = 0
+
+    def _finish_migration(self) -> None:
+        """
+        helper method to complete an incremental resize, if one is running
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._old_buckets.length())
 
     def table_load(self) -> float:
         """
@@ -199,17 +622,38 @@ class HashMap:
         """
         return self._capacity-self._size
 
+    def memory_usage(self) -> dict:
+        """
+        Report the bytes used by the hashmap. Values are not counted
+        return dict: bytes used by 'buckets' (the bucket array), 'entries'
+        (entry objects and their cached hashes, tombstones included), 'keys'
+        (key objects) and their 'total'
+        """
+        self._finish_migration()
+        usage = {'buckets': sys.getsizeof(self._buckets),
+                 'entries': 0,
+                 'keys': 0}
+
+        for item in self._buckets.view():
+            if item is not None:
+                usage['entries'] += object_size(item)
+                usage['entries'] += sys.getsizeof(item.hash)
+                usage['keys'] += sys.getsizeof(item.key)
+
+        usage['total'] = usage['buckets'] + usage['entries'] + usage['keys']
+        return usage
+
     def get(self, key: str) -> object:
         """
         Get value associated with key
         param key: key user is searching for
         return object: target key's value
         """
-        for item in self:
-            if item and item.key == key and not item.is_tombstone:
-                    return item.value
+        buckets, target = self._locate(key)
+        if target is None:
+            return None
 
-        return None
+        return buckets.view()[target].value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -217,22 +661,89 @@ class HashMap:
         param key: key user is searching for
         return bool: True if key is found else False
         """
-        for item in self:
-            if item and item.key == key and not item.is_tombstone:
-                    return True
-
-        return False
+        return self._locate(key)[1] is not None
 
     def remove(self, key: str) -> None:
         """
         Searches for and removes target key from hashmap
         param key: key user wishes to remove
         """
-        for item in self:
-            # remove item by setting tombstone to True and decr size
-            if item and item.key == key and not item.is_tombstone:
-                    item.is_tombstone = True
-                    self._size -= 1
+        buckets, target = self._locate(key)
+
+        # remove item by setting tombstone to True and decr size
+        if target is not None:
+            self._remove_at(buckets, target)
+
+    def _locate(self, key: str) -> tuple:
+        """
+        helper method to find the live entry for key. While an incremental
+        resize is running, the key may be in either the current or the old
+        table, and each call moves a few entries along
+        param key: key user is searching for
+        return tuple: (bucket array, index) of the live entry, or
+        (None, None) if key is not present
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_STEP)
+
+        hashValue = self._hash_function(key)
+        target = self._find_live(self._buckets, self._capacity, hashValue, key)
+        if target is not None:
+            return self._buckets, target
+
+        if self._old_buckets is not None:
+            target = self._find_live(self._old_buckets, self._old_capacity,
+                                     hashValue, key)
+            if target is not None:
+                return self._old_buckets, target
+
+        return None, None
+
+    def _find_live(self, buckets: DynamicArray, capacity: int,
+                   hash_value: int, key: str) -> int:
+        """
+        helper method to locate the index of a live entry using the same
+        quadratic probe sequence as put. Stops at the first never-used
+        (None) index and skips over tombstones.
+        param key: key user is searching for
+        return int: index of the live entry, or None if key is not present
+        """
+        index = self._hash_index(hash_value, capacity)
+        step, probeStep = 1, self._probe_step
+        slots = buckets.view()
+
+        # a miss ends at the first entry closer to its home than key would
+        # be, see _robin_hood_insert
+        if self._robin_hood:
+            distance = 0
+            item = slots[index]
+            while (item is not None and
+                   self._displacement(item, index) >= distance):
+                if item.hash == hash_value and item.key == key:
+                    return index
+
+                index = (index + 1) % capacity
+                distance += 1
+                item = slots[index]
+
+            return None
+
+        # an empty index ends the probe sequence, the key can't be past it
+        # (tombstones bounded by load factor, so at most capacity steps)
+        for _ in range(capacity):
+            item = slots[index]
+            if item is None:
+                return None
+
+            # put keeps at most one entry per key, so a tombstoned match
+            # means the key was removed
+            if item.hash == hash_value and item.key == key:
+                return None if item.is_tombstone else index
+
+            index = (index + step) % capacity
+            step += probeStep
+
+        return None
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -242,8 +753,7 @@ class HashMap:
         tupleArr = DynamicArray()
 
         for item in self:
-            if item and not item.is_tombstone:
-                tupleArr.append((item.key, item.value))
+            tupleArr.append((item.key, item.value))
 
         return tupleArr
 
@@ -259,32 +769,61 @@ class HashMap:
         for bucket in range(self._capacity):
             self._buckets.append(None)
         self._size = 0
+        self._tombstones = 0
+        self._version += 1
+
+        # any incremental resize in progress is abandoned
+        self._old_buckets = None
+        self._old_capacity = 0
 
     def __iter__(self):
         """
-        Enables iteration over hashmap
+        Enables iteration over hashmap. Each call returns a new iterator, so
+        nested loops over the same hashmap don't share a cursor
         """
-        self.index = 0
-        return self
+        return self._iter_entries()
 
-    def __next__(self):
+    def _iter_entries(self):
         """
-        Returns the next item in the hashmap based on the current location of the iterator
-        return value: next item in hashmap that is not a tombstone or None
+        Generator over the live entries in the hashmap, skipping empty
+        indices and tombstones. Raises RuntimeError if keys are added or
+        removed while iterating
         """
-        try:
-            value = None
+        # entries are only walked in one table
+        self._finish_migration()
+
+        version = self._version
 
-            # loop until not none or tombstoned
-            while value is None or value.is_tombstone:
-                value = self._buckets.get_at_index(self.index)
-                self.index += 1
+        for item in self._buckets.view():
+            if self._version != version:
+                raise RuntimeError("HashMap changed size during iteration")
 
-        # if out of bounds raise StopIteration
-        except DynamicArrayException:
-            raise StopIteration
+            if item is not None and not item.is_tombstone:
+                yield item
 
-        return value
+        if self._version != version:
+            raise RuntimeError("HashMap changed size during iteration")
+
+    def keys(self):
+        """
+        Iterate over the keys in the hashmap without copying them
+        """
+        for item in self._iter_entries():
+            yield item.key
+
+    def values(self):
+        """
+        Iterate over the values in the hashmap without copying them
+        """
+        for item in self._iter_entries():
+            yield item.value
+
+    def items(self):
+        """
+        Iterate over (key, value) tuples in the hashmap without copying them
+        """
+        for item in self._iter_entries():
+            yield item.key, item.value
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -0,0 +1,418 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Open addressing hash map with quadratic probing, stored as
+# parallel arrays instead of one HashEntry object per index. Each index
+# costs an 8 byte hash, a 1 byte state and two list slots for the key and
+# value, so there is no per-entry object or __dict__. Same put/get/remove
+# behavior as hash_map_oa.HashMap, including tombstones and the 0.5 load
+# factor threshold.
+# Methods:
+# put() - adds or updates a new key/value pair to the hash map.
+# resize_table() - resizes the hash table to passed in new capacity.
+# table_load() - returns the current load factor of the hash table.
+# empty_buckets() - returns the number of empty buckets in the hash table.
+# get() - returns the value associated with the given key.
+# contains_key() - returns whether or not a key is in the hash table.
+# remove() - removes the key/value pair associated with the given key.
+# get_keys_and_values() - returns a dynamic array of all keys and values in the hash table.
+# clear() - clears all contents of the hash table without changing the underlying hash table capacity.
+# memory_usage() - reports the bytes used by the arrays and keys.
+# __iter__() - iterates over the live entries of the hash map, as HashEntry
+# objects made on the fly.
+# keys(), values(), items() - iterate over the keys, values or key/value
+# pairs of the hash map.
+
+import sys
+from array import array
+
+from a6_include import (DynamicArray, HashEntry, is_prime, next_prime,
+                        get_hash_function, hash_function_1, hash_function_2)
+
+
+# index states kept in the state bytearray
+_EMPTY = 0
+_LIVE = 1
+_TOMBSTONE = 2
+
+# hashes are stored as unsigned 64 bit integers
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses quadratic probing for collision
+        resolution and stores its entries in parallel arrays
+        param function: hash function, or the name of one in
+        a6_include.HASH_FUNCTIONS such as 'fnv1a' or 'xxhash'
+        """
+        # capacity must be a prime number
+        self._capacity = next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = get_hash_function(function)
+        self._size = 0
+        self._tombstones = 0
+        self._version = 0
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        helper method to create empty parallel arrays for capacity indices
+        """
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._states = bytearray(capacity)
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == _EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += (f"{i}: K: {self._keys[i]} V: {self._values[i]} "
+                        f"TS: {self._states[i] == _TOMBSTONE}\n")
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        This method updates the key/value pair in the hashmap
+        param key: key to be updated
+        param value: value to be updated
+        conditions: if key is already in hashmap, update value @ key with new value
+                    if key is not in hashmap, a new key/value pair is added
+        """
+        threshold = 0.5
+
+        # tombstones lengthen probe sequences just like live entries, so
+        # both count towards the threshold. If most occupied indices are
+        # tombstones, rebuild at the same capacity instead of growing
+        if (self._size + self._tombstones)/self._capacity > threshold:
+            if self._tombstones > self._size:
+                self._rehash(self._capacity)
+            else:
+                self.resize_table(self._capacity*2)
+
+        hashValue = self._hash_function(key) & _MASK_64
+        target = self._quad_probe(hashValue, key)
+        state = self._states[target]
+
+        if state != _LIVE:
+            self._hashes[target] = hashValue
+            self._states[target] = _LIVE
+            self._keys[target] = key
+            self._size += 1
+            self._version += 1
+
+            # a reused tombstone no longer counts as removed
+            if state == _TOMBSTONE:
+                self._tombstones -= 1
+
+        # update value at the target index
+        self._values[target] = value
+
+    def _quad_probe(self, hash_value: int, key: str) -> int:
+        """
+        helper method to probe for the index holding key, live or
+        tombstoned, or else the first empty index, using quadratic probing
+        return int: the index, or None if capacity indices were probed
+        without finding either. Quadratic probing reaches only about half
+        of a prime capacity, and put can fill all of those. put grows the
+        table before that, so only lookups of missing keys get None
+        """
+        states, hashes, keys = self._states, self._hashes, self._keys
+        capacity = self._capacity
+        index = hash_value % capacity
+        step = 1
+
+        for _ in range(capacity):
+            if states[index] == _EMPTY:
+                return index
+            if hashes[index] == hash_value and keys[index] == key:
+                return index
+
+            # offsets 1, 4, 9, ... built up by adding 1, 3, 5, ...
+            index = (index + step) % capacity
+            step += 2
+
+        return None
+
+    def _find_index(self, key: str) -> int:
+        """
+        helper method to locate the index of a live entry. Stops at the first
+        empty index and skips over tombstones
+        param key: key user is searching for
+        return int: index of the live entry, or None if key is not present
+        """
+        hashValue = self._hash_function(key) & _MASK_64
+        target = self._quad_probe(hashValue, key)
+
+        if target is not None and self._states[target] == _LIVE:
+            return target
+        return None
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change capacity of the internal hash table to new_capacity
+        param new_capacity: new capacity to resize to
+        """
+        # Check if new capacity is greater than current size if not return
+        # without resizing
+        if new_capacity <= self._size:
+            return
+
+        # make sure new capacity is prime
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+
+        # grow the same way a run of puts into the new table would
+        while (self._size - 1)/new_capacity > 0.5:
+            new_capacity = next_prime(new_capacity*2)
+
+        self._rehash(new_capacity)
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        helper method to move every live entry into new arrays of
+        new_capacity, using the stored hashes and dropping tombstones
+        param new_capacity: capacity of the new arrays
+        """
+        oldHashes, oldStates = self._hashes, self._states
+        oldKeys, oldValues = self._keys, self._values
+
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        states, hashes = self._states, self._hashes
+        keys, values = self._keys, self._values
+
+        for old in range(len(oldStates)):
+            if oldStates[old] != _LIVE:
+                continue
+
+            hashValue = oldHashes[old]
+            index = hashValue % new_capacity
+            step = 1
+            while states[index] != _EMPTY:
+                index = (index + step) % new_capacity
+                step += 2
+
+            hashes[index] = hashValue
+            states[index] = _LIVE
+            keys[index] = oldKeys[old]
+            values[index] = oldValues[old]
+
+        self._tombstones = 0
+        self._version += 1
+
+    def table_load(self) -> float:
+        """
+        Calculate and return load factor
+        load factor(lambda) = n(number of elements)/m(number of buckets)
+        return float: load factor
+        """
+        return self._size/self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty buckets.
+        empty buckets = m - n
+        return int: number of empty buckets
+        """
+        return self._capacity-self._size
+
+    def memory_usage(self) -> dict:
+        """
+        Report the bytes used by the hashmap. Values are not counted
+        return dict: bytes used by 'buckets' (the parallel arrays),
+        'entries' (always 0, there are no entry objects), 'keys' (key
+        objects, tombstones included) and their 'total'
+        """
+        usage = {'buckets': (sys.getsizeof(self._hashes) +
+                             sys.getsizeof(self._states) +
+                             sys.getsizeof(self._keys) +
+                             sys.getsizeof(self._values)),
+                 'entries': 0,
+                 'keys': 0}
+
+        for index in range(self._capacity):
+            if self._states[index] != _EMPTY:
+                usage['keys'] += sys.getsizeof(self._keys[index])
+
+        usage['total'] = usage['buckets'] + usage['entries'] + usage['keys']
+        return usage
+
+    def get(self, key: str) -> object:
+        """
+        Get value associated with key
+        param key: key user is searching for
+        return object: target key's value
+        """
+        target = self._find_index(key)
+        if target is None:
+            return None
+
+        return self._values[target]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Check if key is in hashmap
+        param key: key user is searching for
+        return bool: True if key is found else False
+        """
+        return self._find_index(key) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Searches for and removes target key from hashmap
+        param key: key user wishes to remove
+        """
+        target = self._find_index(key)
+
+        # the key stays behind for probing, the value is released
+        if target is not None:
+            self._states[target] = _TOMBSTONE
+            self._values[target] = None
+            self._size -= 1
+            self._tombstones += 1
+            self._version += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray that contains all keys and values in a hashmap
+        return DynamicArray: DynamicArray, contains tuples of key and value
+        """
+        tupleArr = DynamicArray()
+
+        for pair in self.items():
+            tupleArr.append(pair)
+
+        return tupleArr
+
+    def clear(self) -> None:
+        """
+        Clears all contents of the hashmap without changing underlying hash
+        table capacity
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+        self._version += 1
+
+    def _iter_indices(self):
+        """
+        Generator over the indices of live entries. Raises RuntimeError if
+        keys are added or removed while iterating
+        """
+        version = self._version
+        states = self._states
+
+        for index in range(len(states)):
+            if self._version != version:
+                raise RuntimeError("HashMap changed size during iteration")
+
+            if states[index] == _LIVE:
+                yield index
+
+        if self._version != version:
+            raise RuntimeError("HashMap changed size during iteration")
+
+    def __iter__(self):
+        """
+        Enables iteration over the live entries of the hashmap, like
+        hash_map_oa.HashMap. No entries are stored, so each one is a new
+        HashEntry with the key and value. keys, values and items don't make
+        any objects
+        """
+        for index in self._iter_indices():
+            yield HashEntry(self._keys[index], self._values[index])
+
+    def keys(self):
+        """
+        Iterate over the keys in the hashmap without copying them
+        """
+        for index in self._iter_indices():
+            yield self._keys[index]
+
+    def values(self):
+        """
+        Iterate over the values in the hashmap without copying them
+        """
+        for index in self._iter_indices():
+            yield self._values[index]
+
+    def items(self):
+        """
+        Iterate over (key, value) tuples in the hashmap without copying them
+        """
+        for index in self._iter_indices():
+            yield self._keys[index], self._values[index]
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput example")
+    print("-----------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nget/remove example")
+    print("------------------")
+    m = HashMap(151, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    m.remove('207')
+    print(m.get_size(), m.get_capacity())
+    for i in range(200, 300, 21):
+        print(i, m.get(str(i)), m.contains_key(str(i)))
+
+    print("\nget_keys_and_values example")
+    print("---------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+
+    print("\nmissing key example")
+    print("-------------------")
+    # 3 keys fill every index that quadratic probing reaches from a home
+    # in a table of 5, so misses must stop after capacity probes
+    m = HashMap(5, hash_function_1)
+    for key in 'abc':
+        m.put(key, key.upper())
+    print(m.get_capacity(), m.get('a'),
+          [m.get(chr(i)) for i in range(100, 201)].count(None))
+
+    print("\nmemory_usage example")
+    print("--------------------")
+    import hash_map_oa
+    m = HashMap(11, hash_function_1)
+    n = hash_map_oa.HashMap(11, hash_function_1)
+    for i in range(1000):
+        m.put('str' + str(i), i)
+        n.put('str' + str(i), i)
+    print(m.memory_usage())
+    print(n.memory_usage())
@@ -5,9 +5,13 @@
 # Due Date: 12/07/2023
 # Description: Hash Map implementation using separate chaining for collision
 # resolution. The underlying data structure is a DynamicArray of LinkedLists(
-# singly linked lists).
+# singly linked lists). A chain that grows past 8 nodes is replaced by a
+# SortedChain, which binary searches its nodes by (hash, key), and goes back
+# to a linked list once it shrinks below 6.
 # Methods:
 # put(): updates the key/value pair in the hash map
+# setdefault(): returns the value at a key, adding a default if missing
+# update_with(): replaces the value at a key with fn(value) in place
 # resize_table(): changes the capacity of the internal hash table
 # table_load(): calculates and returns the load factor
 # empty_buckets(): returns the number of empty buckets in the table
@@ -17,32 +21,100 @@
 # get_keys_and_values(): returns a DynamicArray of tuples containing  all the
 # key/value pairs in the hash map
 # clear(): clears the hash map
+# memory_usage(): reports the bytes used by buckets, entries and keys
+# put_many(), get_many(), remove_many(): batch versions of put, get and
+# remove that hash the whole batch in one pass
+# reserve(): grows the table once to hold a given number of key/value pairs
+# from_items(): builds a hash map from key/value pairs without resizing
+# average_visits(): average number of chain nodes visited per lookup
 # find_mode(): returns the mode(s) and their frequency in a tuple
+# top_k(): returns the n most frequent values and their frequencies
 
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+import heapq
+import sys
+from itertools import islice
+from operator import itemgetter
+
+# optional, only used by the chunked path of find_mode and top_k
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from a6_include import (DynamicArray, LinkedList, SlottedLinkedList,
+                        SortedChain, CHAIN_POLICIES, is_prime, next_prime,
+                        next_power_of_two, get_hash_function, object_size,
+                        hash_many, hash_indices, hash_function_1,
+                        hash_function_2)
 
 
 class HashMap:
+    # max number of non-empty buckets moved per operation while resizing
+    # incrementally, up to 10 times as many buckets are visited
+    _MIGRATE_STEP = 2
+
+    # a chain longer than this is converted to a SortedChain, and back to a
+    # linked list once it is shorter than _UNTREEIFY_THRESHOLD. The gap
+    # keeps a chain from flipping back and forth on every put and remove
+    _TREEIFY_THRESHOLD = 8
+    _UNTREEIFY_THRESHOLD = 6
+
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental: bool = False,
+                 power_of_two: bool = False,
+                 slots: bool = False,
+                 chain_policy: str = None) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        param function: hash function, or the name of one in
+        a6_include.HASH_FUNCTIONS such as 'fnv1a' or 'xxhash'
+        param incremental: if True, growing the table moves chains a few at a
+        time on later operations instead of all at once in a single put
+        param power_of_two: if True, capacity is kept a power of two and
+        buckets are found with a bit mask. Only suited to hash functions
+        whose low bits are well mixed
+        param slots: if True, chains are SlottedLinkedLists of
+        SlottedSLNodes, which have no per-instance __dict__
+        param chain_policy: 'move_to_front' or 'transpose' to move a key
+        found by get or contains_key towards the head of its chain, so hot
+        keys are found after fewer nodes. None keeps insertion order
         """
-        self._buckets = DynamicArray()
+        if chain_policy not in CHAIN_POLICIES:
+            raise ValueError(f"unknown chain policy {chain_policy!r}, "
+                             f"expected one of {CHAIN_POLICIES}")
+
+        self._list_class = SlottedLinkedList if slots else LinkedList
+        self._chain_policy = chain_policy
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        # nodes visited by get and contains_key, see average_visits
+        self._lookups = 0
+        self._visits = 0
+
+        # capacity must be a prime number, or a power of two in mask mode
+        self._power_of_two = power_of_two
+        if power_of_two:
+            self._capacity = next_power_of_two(capacity)
+        else:
+            self._capacity = self._next_prime(capacity)
+        self._buckets = DynamicArray(
+            [self._list_class() for _ in range(self._capacity)])
 
-        self._hash_function = function
+        self._hash_function = get_hash_function(function)
         self._size = 0
 
+        # table being migrated from during an incremental resize. Chains in
+        # the new table are created on first use until _fill_index catches
+        # up with its capacity
+        self._incremental = incremental
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+        self._fill_index = 0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -55,36 +127,18 @@ class HashMap:
 
     def _next_prime(self, capacity: int) -> int:
         """
-        Increment from given number and the find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Increment from given number and the find the closest prime number,
+        found by binary search in a table of small primes or by
+        Miller-Rabin tests for larger capacities
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
-
-        if capacity == 1 or capacity % 2 == 0:
-            return False
-
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
-
-        return True
+        return is_prime(capacity)
 
     def get_size(self) -> int:
         """
@@ -112,29 +166,191 @@ class HashMap:
         return : None
         modify : if key already exists, replace value
         """
+        # existing node is updated in place rather than removed and
+        # reinserted
+        node = self._find_or_insert(key, value)
+        node.value = value
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        returns the value associated with key. If key is NOT in the hash
+        map, a new key/value pair is added with default as its value.
+        param key: search target
+        param default: value to add at key if key is not found
+        return : the value at key after the call
+        """
+        return self._find_or_insert(key, default).value
+
+    def update_with(self, key: str, fn: callable,
+                    default: object = None) -> object:
+        """
+        replaces the value associated with key with fn(value) in place. If
+        key is NOT in the hash map, a new key/value pair is added with
+        fn(default) as its value, e.g. update_with(key, lambda v: v + 1, 0)
+        counts occurrences of key.
+        param key: key to be updated
+        param fn: callable taking the current value and returning the new one
+        param default: value handed to fn if key is not found
+        return : the new value at key
+        """
+        node = self._find_or_insert(key, default)
+        node.value = fn(node.value)
+        return node.value
+
+    def _find_or_insert(self, key: str, default: object):
+        """
+        helper method for put, setdefault and update_with. Walks the chain
+        at the hashKey index once and returns the SLNode holding key so the
+        caller can overwrite its value in place. If key is not found, a new
+        node holding default is inserted and returned.
+        param key: search target
+        param default: value of the new node if key is not found
+        return : SLNode holding key
+        """
         threshold = 1.0
 
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_STEP)
+
         # resize if load factor is greater than threshold
         if self.table_load() >= threshold:
-            self.resize_table(self._capacity*2)
+            self._finish_migration()
 
-        hashKey = self._hash_function(key) % self._capacity
-        currChain = self._buckets.get_at_index(hashKey)
+            if self._incremental:
+                self._start_migration(self._grow_capacity(self._capacity))
+            else:
+                self.resize_table(self._capacity*2)
 
-        keyFound = False
+        hashValue = self._hash_function(key)
+        hashKey = self._hash_index(hashValue, self._capacity)
+        currChain = self._chain(hashKey)
 
         # check if key is already in the hash map
-        for item in currChain:
-            if item.key == key:
-                keyFound = True
+        node = currChain.contains(key, hashValue)
+        if node is not None:
+            return node
 
-        # if key is found remove else incr size to insert new key
-        if keyFound:
-            currChain.remove(key)
-        else:
-            self._size += 1
+        # key may still be waiting to be migrated, update it in place
+        oldChain = self._old_chain(hashValue)
+        if oldChain is not None:
+            node = oldChain.contains(key, hashValue)
+            if node is not None:
+                return node
+
+        # new key is inserted at the front of the chain
+        currChain.insert(key, default, hashValue)
+        self._size += 1
+
+        currChain = self._rebalance_chain(self._buckets.view(), hashKey)
+        return currChain.contains(key, hashValue)
+
+    def put_many(self, pairs) -> None:
+        """
+        updates every key/value pair in pairs, the same as calling put on
+        each. The table is grown at most once, up front, and the whole
+        batch is hashed in one pass
+        param pairs: iterable of (key, value) tuples
+        return : None
+        """
+        pairs = list(pairs)
+        hashes = hash_many(self._hash_function, [key for key, _ in pairs])
+
+        self._presize(self._size + len(pairs), amortized=True)
+        chains = self._buckets.view()
+        indices = hash_indices(hashes, self._capacity)
+        for (key, value), hashValue, hashKey in zip(pairs, hashes, indices):
+            currChain = chains[hashKey]
+            node = currChain.contains(key, hashValue)
+            if node is not None:
+                node.value = value
+            else:
+                currChain.insert(key, value, hashValue)
+                self._size += 1
+                self._rebalance_chain(chains, hashKey)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        returns the value associated with each key in keys
+        param keys: iterable of search targets
+        return : DynamicArray of values in the same order as keys, None for
+        any key that is not in the hash map
+        """
+        keys = list(keys)
+        hashes = hash_many(self._hash_function, keys)
+        self._finish_migration()
+
+        values = []
+        chains = self._buckets.view()
+        indices = hash_indices(hashes, self._capacity)
+        for key, hashValue, hashKey in zip(keys, hashes, indices):
+            node = chains[hashKey].contains(key, hashValue)
+            values.append(None if node is None else node.value)
+
+        return DynamicArray(values)
+
+    def remove_many(self, keys) -> int:
+        """
+        removes every key in keys that is in the hash map
+        param keys: iterable of search targets
+        return : number of key/value pairs removed
+        """
+        keys = list(keys)
+        hashes = hash_many(self._hash_function, keys)
+        self._finish_migration()
+
+        removed = 0
+        chains = self._buckets.view()
+        indices = hash_indices(hashes, self._capacity)
+        for key, hashValue, hashKey in zip(keys, hashes, indices):
+            if chains[hashKey].remove(key, hashValue):
+                self._rebalance_chain(chains, hashKey)
+                removed += 1
+
+        self._size -= removed
+        return removed
+
+    @classmethod
+    def from_items(cls, items, function: callable = hash_function_1,
+                   **options) -> 'HashMap':
+        """
+        builds a new hash map holding every key/value pair in items. The
+        bucket array is created at its final capacity, so no resizes happen
+        param items: iterable of (key, value) tuples
+        param function: hash function, or the name of one
+        param options: incremental, power_of_two, slots or chain_policy, as
+        for __init__
+        return : the new hash map
+        """
+        items = list(items)
+        hashMap = cls(max(1, len(items)), function, **options)
+        hashMap.put_many(items)
+        return hashMap
+
+    def reserve(self, count: int) -> None:
+        """
+        grows the table once so that count nodes fit under the 1.0 load
+        factor threshold, so the puts that follow never resize. Never
+        shrinks the table
+        param count: number of key/value pairs the hash map must hold
+        return : None
+        """
+        self._presize(count)
+
+    def _presize(self, count: int, amortized: bool = False) -> None:
+        """
+        helper method to grow the table once so that count nodes fit under
+        the load factor threshold without any further resizes
+        param count: number of nodes the table must hold
+        param amortized: if True, growing at least doubles the capacity like
+        a single put, so a stream of put_many batches resizes only a
+        logarithmic number of times. reserve keeps the exact size
+        """
+        self._finish_migration()
 
-        currChain.insert(key, value)
+        if count > self._capacity:
+            if amortized:
+                count = max(count, self._capacity*2)
+            self._rehash(self._fit_capacity(count))
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -148,25 +364,236 @@ class HashMap:
             return
 
         # make sure new capacity is prime
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
+        new_capacity = self._fit_capacity(new_capacity)
 
-        newTable = HashMap(new_capacity, self._hash_function)
+        # nodes are moved once into a table big enough to hold them all,
+        # growing the same way a run of puts into the new table would
+        while (self._size - 1)/new_capacity >= 1.0:
+            new_capacity = self._grow_capacity(new_capacity)
 
-        if new_capacity == 2:
-            newTable._capacity = 2
+        self._rehash(new_capacity)
 
-        # old table -> new table
-        for bucket in range(self._capacity):
-            currChain = self._buckets.get_at_index(bucket)
-            if currChain.length() > 0:
-                for item in currChain:
-                    newTable.put(item.key, item.value)
+    def _fit_capacity(self, capacity: int) -> int:
+        """
+        helper method to round a requested capacity up to the nearest valid
+        one, a prime or a power of two in mask mode
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+
+        if not self._is_prime(capacity):
+            capacity = self._next_prime(capacity)
+        return capacity
+
+    def _grow_capacity(self, capacity: int) -> int:
+        """
+        helper method to return the capacity the table grows to from capacity
+        """
+        return self._fit_capacity(capacity*2)
+
+    def _hash_index(self, hash_value: int, capacity: int) -> int:
+        """
+        helper method to map a hash to its bucket in a table of capacity,
+        masking off the low bits in power of two mode
+        """
+        if self._power_of_two:
+            return hash_value & (capacity - 1)
+        return hash_value % capacity
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        helper method to move every existing SLNode into a new bucket array
+        of new_capacity. Keys are unique, so each node is linked onto the
+        front of its new chain without duplicate checks or threshold checks
+        param new_capacity: capacity of the new bucket array
+        """
+        self._finish_migration()
+
+        newBuckets = DynamicArray(
+            [self._list_class() for _ in range(new_capacity)])
+        newChains = newBuckets.view()
+
+        # old table -> new table, the chain iterator has already moved past
+        # a node by the time it is relinked
+        for currChain in self._buckets.view():
+            for node in currChain:
+                hashKey = self._hash_index(node.hash, new_capacity)
+                newChains[hashKey].insert_node(node)
+
+        for hashKey in range(new_capacity):
+            if newChains[hashKey].length() > self._TREEIFY_THRESHOLD:
+                self._rebalance_chain(newChains, hashKey)
 
         # update self to new hash map
-        self._buckets = newTable._buckets
-        self._size = newTable._size
-        self._capacity = newTable._capacity
+        self._buckets = newBuckets
+        self._capacity = new_capacity
+
+    def _start_migration(self, new_capacity: int) -> None:
+        """
+        helper method to begin an incremental resize. The current table is
+        kept as the old table and a table of new_capacity takes its place.
+        Chains move over a few buckets at a time in _migrate
+        param new_capacity: capacity of the new table
+        """
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrate_index = 0
+
+        # chains are created lazily, see _chain and _fill
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._capacity = new_capacity
+        self._fill_index = 0
+
+    def _migrate(self, limit: int) -> None:
+        """
+        helper method to move the chains of up to limit non-empty buckets
+        from the old table to the current one, visiting at most 10 * limit
+        buckets. The old table is dropped once every bucket has been visited
+        param limit: max number of non-empty buckets to move
+        """
+        oldChains = self._old_buckets.view()
+        end = len(oldChains)
+        start = index = self._migrate_index
+        stop = min(end, index + limit * 10)
+        moved = 0
+
+        while index < stop and moved < limit:
+            currChain = oldChains[index]
+            if currChain.length() > 0:
+                for node in currChain:
+                    hashKey = self._hash_index(node.hash, self._capacity)
+                    self._chain(hashKey).insert_node(node)
+                    self._rebalance_chain(self._buckets.view(), hashKey)
+                moved += 1
+
+            # migrated buckets are never read again
+            oldChains[index] = None
+            index += 1
+
+        # new table has about twice as many buckets, so creating 3 chains
+        # per bucket visited finishes them before the migration ends
+        self._fill(3 * (index - start))
+
+        self._migrate_index = index
+        if index >= end:
+            self._fill(self._buckets.length())
+            self._old_buckets = None
+            self._old_capacity = 0
+
+    def _finish_migration(self) -> None:
+        """
+        helper method to complete an incremental resize, if one is running
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._old_buckets.length())
+
+    def _fill(self, count: int) -> None:
+        """
+        helper method to create up to count missing chains in the current
+        table, continuing from where the last call stopped
+        param count: number of buckets to visit
+        """
+        chains = self._buckets.view()
+        end = min(len(chains), self._fill_index + count)
+        for bucket in range(self._fill_index, end):
+            if chains[bucket] is None:
+                chains[bucket] = self._list_class()
+        self._fill_index = end
+
+    def _chain(self, index: int) -> LinkedList:
+        """
+        helper method to return the chain at index in the current table,
+        creating it first if an incremental resize hasn't yet
+        param index: bucket index
+        return : LinkedList at index
+        """
+        # index always comes from _hash_index, so it is in range
+        chains = self._buckets.view()
+        chain = chains[index]
+        if chain is None:
+            chain = chains[index] = self._list_class()
+        return chain
+
+    def _rebalance_chain(self, chains: list, index: int):
+        """
+        helper method to swap the chain at index for a SortedChain once it
+        grows past _TREEIFY_THRESHOLD nodes, so lookups in it binary search
+        by (hash, key), and back to a linked list once it shrinks below
+        _UNTREEIFY_THRESHOLD
+        param chains: bucket list, from DynamicArray.view()
+        param index: bucket index
+        return : the chain at index afterwards
+        """
+        chain = chains[index]
+
+        if isinstance(chain, SortedChain):
+            if chain.length() < self._UNTREEIFY_THRESHOLD:
+                # nodes are pushed on the front, so go through them backwards
+                # to keep their order
+                linked = self._list_class()
+                for node in reversed(list(chain)):
+                    linked.insert_node(node)
+                chains[index] = chain = linked
+
+        elif chain.length() > self._TREEIFY_THRESHOLD:
+            chains[index] = chain = SortedChain(self._list_class._node_class,
+                                                chain)
+
+        return chain
+
+    def _old_chain(self, hash_value: int) -> LinkedList:
+        """
+        helper method to return the chain a key would be in in the old table
+        during an incremental resize
+        param hash_value: hash of the key
+        return : LinkedList, or None if no resize is running or that bucket
+        was already migrated
+        """
+        if self._old_buckets is None:
+            return None
+
+        hashKey = self._hash_index(hash_value, self._old_capacity)
+        if hashKey < self._migrate_index:
+            return None
+
+        return self._old_buckets.view()[hashKey]
+
+    def _find_node(self, key: str):
+        """
+        helper method to return the SLNode holding key, looking in the old
+        table as well while an incremental resize is running. The chain is
+        reordered by the chain policy and the nodes visited are counted
+        param key: search target
+        return : SLNode, or None if key is not in the hash map
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_STEP)
+
+        hashValue = self._hash_function(key)
+        hashKey = self._hash_index(hashValue, self._capacity)
+        node, visited = self._chain(hashKey).search(key, hashValue,
+                                                    self._chain_policy)
+
+        if node is None:
+            oldChain = self._old_chain(hashValue)
+            if oldChain is not None:
+                node, oldVisited = oldChain.search(key, hashValue,
+                                                   self._chain_policy)
+                visited += oldVisited
+
+        self._lookups += 1
+        self._visits += visited
+        return node
+
+    def average_visits(self) -> float:
+        """
+        returns the average number of chain nodes visited per get or
+        contains_key call so far, hits and misses alike
+        return : average nodes visited, 0.0 before the first lookup
+        """
+        if self._lookups == 0:
+            return 0.0
+        return self._visits / self._lookups
 
     def table_load(self) -> float:
         """
@@ -182,36 +609,51 @@ class HashMap:
         params: None
         return bucketCount: n empty buckets as int
         """
+        self._finish_migration()
         bucketCount = 0
 
         # iterate through the buckets and incr for every empty bucket
-        for bucket in range(self._capacity):
-            if self._buckets.get_at_index(bucket).length() == 0:
+        for currChain in self._buckets.view():
+            if currChain.length() == 0:
                 bucketCount += 1
 
         return bucketCount
 
+    def memory_usage(self) -> dict:
+        """
+        Report the bytes used by the hash map. Values are not counted
+        return : dict of bytes used by 'buckets' (the bucket array and its
+        LinkedLists), 'entries' (SLNodes and their cached hashes), 'keys'
+        (key objects) and their 'total'
+        """
+        self._finish_migration()
+        usage = {'buckets': sys.getsizeof(self._buckets),
+                 'entries': 0,
+                 'keys': 0}
+
+        for currChain in self._buckets.view():
+            usage['buckets'] += object_size(currChain)
+            for node in currChain:
+                usage['entries'] += object_size(node)
+                usage['entries'] += sys.getsizeof(node.hash)
+                usage['keys'] += sys.getsizeof(node.key)
+
+        usage['total'] = usage['buckets'] + usage['entries'] + usage['keys']
+        return usage
+
     def get(self, key: str):
         """
         returns a value associated with the given key.
         param key: search target
         returns : key's value if found else None
         """
-        # calculate the hashKey to set chain
-        hashKey = self._hash_function(key) % self._capacity
-        chain = self._buckets.get_at_index(hashKey)
+        node = self._find_node(key)
 
-        if chain.length() == 0:
+        # if key is not in the hash map, return None
+        if node is None:
             return None
 
-        # iterate through the chain at the hashKey index
-        # return the value if found
-        for item in chain:
-            if item.key == key:
-                return item.value
-
-        # if key is not in the hash map, return None
-        return None
+        return node.value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -219,33 +661,34 @@ class HashMap:
         param key: search target
         returns : True if found else False
         """
-        # iter through map of buckets
-        for bucket in range(self._capacity):
-            currChain = self._buckets.get_at_index(bucket)
-            # iter through chain at bucket index
-            if currChain.length() > 0:
-                for item in currChain:
-                    # found return true else esc loop and return false
-                    if item.key == key:
-                        return True
-        return False
+        # only the chain at the hashKey index can hold the key
+        return self._find_node(key) is not None
 
-    def remove(self, key: str) -> None:
+    def remove(self, key: str) -> bool:
         """
         searches for arg key and removes it if found
         param key: search target
-        returns : None
+        returns : True if a key/value pair was removed else False
         """
-        # iter through map of buckets
-        for bucket in range(self._capacity):
-            currChain = self._buckets.get_at_index(bucket)
-            # iter through chain at bucket index
-            if currChain.length() > 0:
-                for item in currChain:
-                    # found remove and decr size
-                    if item.key == key:
-                        currChain.remove(key)
-                        self._size -= 1
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_STEP)
+
+        hashValue = self._hash_function(key)
+        hashKey = self._hash_index(hashValue, self._capacity)
+        chain = self._chain(hashKey)
+
+        # single pass over the chain, decr size only if found
+        if chain.remove(key, hashValue):
+            self._rebalance_chain(self._buckets.view(), hashKey)
+            self._size -= 1
+            return True
+
+        oldChain = self._old_chain(hashValue)
+        if oldChain is not None and oldChain.remove(key, hashValue):
+            self._size -= 1
+            return True
+
+        return False
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -253,10 +696,10 @@ class HashMap:
         in the hash map
         return : DynamicArray of tuples(key, value)
         """
+        self._finish_migration()
         contentsArray = DynamicArray()
 
-        for bucket in range(self._capacity):
-            currChain = self._buckets.get_at_index(bucket)
+        for currChain in self._buckets.view():
             for item in currChain:
                 contentsArray.append((item.key, item.value))
 
@@ -270,45 +713,109 @@ class HashMap:
         self._buckets = DynamicArray()
         self._size = 0
 
+        # any incremental resize in progress is abandoned
+        self._old_buckets = None
+        self._old_capacity = 0
+
         # initialize new chains for each bucket
         for bucket in range(self._capacity):
-            self._buckets.append(LinkedList())
+            self._buckets.append(self._list_class())
 
 
-def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
+def _chunk_counts(values, chunk_size: int):
     """
-    return the mode(s) and their frequency in a tuple
-    param da: DynamicArray of strings
-    return : tuple of mode(s) and their frequency
+    generator over (value, count) pairs that add up to the number of times
+    each value occurs in values. Without chunk_size every value is its own
+    pair with a count of 1. With chunk_size and NumPy, values are read
+    chunk_size at a time and each chunk of strings is counted at once with
+    numpy.unique, so each distinct value in a chunk becomes one pair
+    param values: iterable of strings
+    param chunk_size: number of values counted per numpy.unique call
     """
-    # create a new map and move the contents of the dynamic array into it
-    map = HashMap()
-    for bucket in range(da.length()):
-        key = da.get_at_index(bucket)
-        if map.contains_key(key):
-            map.put(key, map.get(key) + 1)
-        else:
-            map.put(key, 1)
+    # DynamicArray can't be iterated, its backing list is read instead
+    if isinstance(values, DynamicArray):
+        values = values.view()
+
+    values = iter(values)
+    if chunk_size is None or np is None:
+        for value in values:
+            yield value, 1
+        return
+
+    while True:
+        chunk = list(islice(values, chunk_size))
+        if not chunk:
+            return
 
-    # setup variables to find mode and frequency
+        # only strings are sorted together, a mix of types may not compare
+        if not all(type(value) is str for value in chunk):
+            for value in chunk:
+                yield value, 1
+            continue
+
+        # an object array holds the strings themselves. A fixed width
+        # unicode array would take 4 bytes per character of the longest
+        # value for every value in the chunk, and drop trailing NULs
+        unique, counts = np.unique(np.array(chunk, dtype=object),
+                                   return_counts=True)
+        yield from zip(unique.tolist(), counts.tolist())
+
+
+def find_mode(da, chunk_size: int = None, capacity: int = 11,
+              function: callable = hash_function_1
+              ) -> tuple[DynamicArray, int]:
+    """
+    return the mode(s) and their frequency in a tuple. values are read
+    once, so da may be any iterable, including a generator too large to
+    keep in memory. The running highest frequency and the values that have
+    it are kept up to date while counting, so no second pass is needed
+    param da: DynamicArray or other iterable of strings
+    param chunk_size: if given and NumPy is installed, count chunk_size
+    values at a time with numpy.unique
+    param capacity: starting capacity of the counting map, the expected
+    number of distinct values
+    param function: hash function of the counting map
+    return : tuple of mode(s) and their frequency
+    """
+    map = HashMap(capacity, function)
     frequency = 0
-    keyValArray = map.get_keys_and_values()
-    mode = DynamicArray()
+    modes = []
 
-    # find the frequency of the mode
-    for pair in range(keyValArray.length()):
-        _, value = keyValArray.get_at_index(pair)
-        if frequency < value:
-            frequency = value
+    for value, count in _chunk_counts(da, chunk_size):
+        count = map.update_with(value, count.__add__, 0)
 
-    # find the modes(s) and append to mode array
-    for pair in range(keyValArray.length()):
-        key, value = keyValArray.get_at_index(pair)
-        if value == frequency:
-            mode.append(key)
+        # a value catching up to the highest frequency joins the modes,
+        # one passing it replaces them
+        if count > frequency:
+            frequency = count
+            modes = [value]
+        elif count == frequency:
+            modes.append(value)
 
     # return an array of mode's and their frequency
-    return mode, frequency
+    return DynamicArray(modes), frequency
+
+
+def top_k(values, n: int, chunk_size: int = None, capacity: int = 11,
+          function: callable = hash_function_1) -> DynamicArray:
+    """
+    return the n most frequent values and their frequencies. values are
+    counted the same way as in find_mode, then a heap of n entries picks
+    the most frequent ones from the counting map
+    param values: DynamicArray or other iterable of strings
+    param n: number of values to return
+    param chunk_size: if given and NumPy is installed, count chunk_size
+    values at a time with numpy.unique
+    param capacity: starting capacity of the counting map
+    param function: hash function of the counting map
+    return : DynamicArray of (value, frequency) tuples, most frequent first
+    """
+    map = HashMap(capacity, function)
+    for value, count in _chunk_counts(values, chunk_size):
+        map.update_with(value, count.__add__, 0)
+
+    pairs = map.get_keys_and_values().view()
+    return DynamicArray(heapq.nlargest(n, pairs, key=itemgetter(1)))
 
 # ------------------- BASIC TESTING ---------------------------------------- #
 
@@ -510,3 +1017,8 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\ntop_k example")
+    print("-------------")
+    words = (str(i % 7 * i % 5) for i in range(1000))
+    print(top_k(words, 3))
@@ -0,0 +1,351 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Hash map sharded across worker processes, to use more than
+# the one core a single map gets under the GIL. Each worker process owns a
+# hash_map_oa.HashMap or hash_map_sc.HashMap holding the keys whose hash
+# modulo the number of shards is its shard number. The front end talks to
+# every worker through its own pipe: a batch is split up by shard, one
+# request goes out to each shard involved before any reply is read, so the
+# workers handle their parts at the same time, and the results are put back
+# in the order of the batch.
+# Methods:
+# put() - adds or updates a new key/value pair to the hash map.
+# get() - returns the value associated with the given key.
+# contains_key() - returns whether or not a key is in the hash map.
+# remove() - removes the key/value pair associated with the given key.
+# put_many(), get_many(), remove_many() - batch versions of put, get and
+# remove, one request per shard.
+# get_size(), get_capacity() - totals over every shard.
+# table_load() - returns the overall load factor.
+# get_keys_and_values() - returns a dynamic array of all keys and values.
+# clear() - clears every shard.
+# close() - stops the worker processes, also done on leaving a with block.
+
+import multiprocessing
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import (DynamicArray, get_hash_function, hash_many,
+                        hash_indices, hash_function_1, hash_function_2)
+
+
+# hash map class owned by each worker, by backend name
+_BACKENDS = {'oa': hash_map_oa.HashMap, 'sc': hash_map_sc.HashMap}
+
+# requests a worker answers, by name. Each takes the worker's map and the
+# request argument and returns something that can be sent back over a pipe
+_OPERATIONS = {
+    'put': lambda m, pairs: m.put_many(pairs),
+    'get': lambda m, keys: m.get_many(keys).view(),
+    'contains': lambda m, keys: [m.contains_key(key) for key in keys],
+    'remove': lambda m, keys: m.remove_many(keys),
+    'size': lambda m, _: m.get_size(),
+    'capacity': lambda m, _: m.get_capacity(),
+    'items': lambda m, _: m.get_keys_and_values().view(),
+    'clear': lambda m, _: m.clear(),
+}
+
+
+def _serve(conn, backend: str, capacity: int, function, options: dict) -> None:
+    """
+    Worker process loop. First replies (True, None) once its map is built,
+    or (False, exception) and exits if building it raised. Then answers
+    requests of (operation name, argument) from conn with (True, result),
+    or (False, exception) if the operation raised, until it receives None
+    """
+    try:
+        m = _BACKENDS[backend](capacity, function, **options)
+    except Exception as error:
+        conn.send((False, error))
+        conn.close()
+        return
+    conn.send((True, None))
+
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+
+        operation, argument = request
+        try:
+            conn.send((True, _OPERATIONS[operation](m, argument)))
+        except Exception as error:
+            conn.send((False, error))
+
+    conn.close()
+
+
+class HashMap:
+    def __init__(self, num_shards: int, function, backend: str = 'oa',
+                 capacity: int = 11, **options) -> None:
+        """
+        Initialize new HashMap that shards its keys across num_shards worker
+        processes
+        param num_shards: number of worker processes
+        param function: hash function, or the name of one in
+        a6_include.HASH_FUNCTIONS. Workers run their own copy, so it must be
+        a module level function. hash gives different string hashes in
+        each process, which is fine as only the front end picks shards
+        param backend: 'oa' or 'sc', the hash map each worker owns
+        param capacity: starting capacity of each worker's map
+        param options: passed on to each worker's map, e.g. incremental or
+        slots. power_of_two is not allowed, the bit mask would pick buckets
+        from the same low bits the shards were picked by. Options the
+        backend rejects raise here, before any worker is started
+        """
+        if backend not in _BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}, "
+                             f"expected one of {tuple(_BACKENDS)}")
+        if options.get('power_of_two'):
+            raise ValueError("power_of_two cannot be used with sharding")
+
+        self._hash_function = get_hash_function(function)
+
+        # a throwaway map checks the options, so a bad one raises here
+        # instead of quietly ending every worker
+        _BACKENDS[backend](capacity, self._hash_function, **options)
+
+        self._num_shards = num_shards
+        self._conns = []
+        self._workers = []
+
+        for _ in range(num_shards):
+            conn, workerConn = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_serve, daemon=True,
+                args=(workerConn, backend, capacity, self._hash_function,
+                      options))
+            worker.start()
+            workerConn.close()
+            self._conns.append(conn)
+            self._workers.append(worker)
+
+        # every worker reports whether its map was built, a failure stops
+        # the others and is raised
+        error = None
+        for conn in self._conns:
+            try:
+                ok, result = conn.recv()
+            except EOFError as exc:
+                ok, result = False, exc
+            if not ok and error is None:
+                error = result
+
+        if error is not None:
+            self.close()
+            raise error
+
+    def __enter__(self) -> 'HashMap':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop every worker process. Their contents are lost. Workers that
+        have already exited are only joined
+        """
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            conn.close()
+        for worker in self._workers:
+            worker.join()
+
+        self._conns = []
+        self._workers = []
+
+    # ------------------------------------------------------------------ #
+
+    def _request(self, operation: str, arguments: dict) -> dict:
+        """
+        helper method to send each shard in arguments its request and then
+        collect the replies, so the shards work on them at the same time
+        param operation: name of the operation in _OPERATIONS
+        param arguments: request argument for each shard number
+        return dict: result of each shard number in arguments
+        """
+        for shard, argument in arguments.items():
+            self._conns[shard].send((operation, argument))
+
+        results = {}
+        error = None
+        for shard in arguments:
+            ok, result = self._conns[shard].recv()
+            if ok:
+                results[shard] = result
+            elif error is None:
+                error = result
+
+        # every reply is read first, so the pipes are ready for the next
+        # request
+        if error is not None:
+            raise error
+        return results
+
+    def _request_all(self, operation: str) -> list:
+        """
+        helper method to send every shard the same request with no argument
+        return list: result of each shard, by shard number
+        """
+        results = self._request(operation, dict.fromkeys(
+            range(self._num_shards)))
+        return [results[shard] for shard in range(self._num_shards)]
+
+    def _split(self, keys: list) -> dict:
+        """
+        helper method to group the positions in keys by shard
+        return dict: list of positions for each shard with at least one key
+        """
+        hashes = hash_many(self._hash_function, keys)
+        positions = {}
+        for position, shard in enumerate(hash_indices(hashes,
+                                                      self._num_shards)):
+            if shard in positions:
+                positions[shard].append(position)
+            else:
+                positions[shard] = [position]
+        return positions
+
+    def _gather(self, operation: str, keys: list) -> list:
+        """
+        helper method to run a per key operation on keys and return its
+        results in the order of keys
+        """
+        positions = self._split(keys)
+        results = self._request(operation, {
+            shard: [keys[position] for position in shardPositions]
+            for shard, shardPositions in positions.items()})
+
+        gathered = [None] * len(keys)
+        for shard, shardPositions in positions.items():
+            for position, result in zip(shardPositions, results[shard]):
+                gathered[position] = result
+        return gathered
+
+    def put(self, key: str, value: object) -> None:
+        """
+        This method updates the key/value pair in the hashmap
+        param key: key to be updated
+        param value: value to be updated
+        """
+        self.put_many([(key, value)])
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds or updates every key/value pair in pairs, with one request to
+        each shard involved
+        param pairs: iterable of (key, value) tuples
+        """
+        pairs = list(pairs)
+        positions = self._split([key for key, _ in pairs])
+        self._request('put', {
+            shard: [pairs[position] for position in shardPositions]
+            for shard, shardPositions in positions.items()})
+
+    def get(self, key: str) -> object:
+        """
+        Get value associated with key
+        param key: key user is searching for
+        return object: target key's value, or None if key is not present
+        """
+        return self._gather('get', [key])[0]
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Get the value associated with each key in keys
+        param keys: iterable of keys
+        return DynamicArray: values in the same order as keys, None for any
+        key that is not present
+        """
+        return DynamicArray(self._gather('get', list(keys)))
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Check if key is in hashmap
+        param key: key user is searching for
+        return bool: True if key is found else False
+        """
+        return self._gather('contains', [key])[0]
+
+    def remove(self, key: str) -> bool:
+        """
+        Searches for and removes target key from hashmap
+        param key: key user wishes to remove
+        return bool: True if a key/value pair was removed else False
+        """
+        return self.remove_many([key]) > 0
+
+    def remove_many(self, keys) -> int:
+        """
+        Removes every key in keys that is in the hashmap
+        param keys: iterable of keys
+        return int: number of key/value pairs removed
+        """
+        keys = list(keys)
+        positions = self._split(keys)
+        results = self._request('remove', {
+            shard: [keys[position] for position in shardPositions]
+            for shard, shardPositions in positions.items()})
+        return sum(results.values())
+
+    def get_size(self) -> int:
+        """
+        Return size of map, over every shard
+        """
+        return sum(self._request_all('size'))
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, over every shard
+        """
+        return sum(self._request_all('capacity'))
+
+    def table_load(self) -> float:
+        """
+        Calculate and return load factor over every shard
+        return float: load factor
+        """
+        return self.get_size()/self.get_capacity()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray that contains all keys and values in a hashmap
+        return DynamicArray: DynamicArray, contains tuples of key and value
+        """
+        tupleArr = DynamicArray()
+
+        for pairs in self._request_all('items'):
+            for pair in pairs:
+                tupleArr.append(pair)
+
+        return tupleArr
+
+    def clear(self) -> None:
+        """
+        Clears all contents of every shard without changing their capacity
+        """
+        self._request_all('clear')
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput/get example")
+    print("---------------")
+    with HashMap(4, hash_function_1) as m:
+        m.put_many(('str' + str(i), i * 100) for i in range(150))
+        print(m.get_size(), m.get('str7'), m.contains_key('str7'))
+        print(m.get_many(['str1', 'missing', 'str149']))
+
+    print("\nremove example")
+    print("--------------")
+    with HashMap(3, hash_function_2, backend='sc') as m:
+        for i in range(200, 300, 7):
+            m.put(str(i), i * 10)
+        print(m.remove('207'), m.remove('207'), m.get_size())
+        print(m.remove_many(str(i) for i in range(200, 300)), m.get_size())
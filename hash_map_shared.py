@@ -0,0 +1,447 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Read only open addressing hash map stored in one flat block of
+# bytes, so that one process can build it and any number of processes can
+# read it in place from shared memory or a memory mapped file, without
+# copying or rebuilding it. The block holds a header, an array of fixed
+# width slots of (hash, offset) pairs and an arena of key/value records the
+# offsets point into. Lookups follow the same quadratic probe sequence as
+# hash_map_oa.HashMap, and tables are sized for its 0.5 load factor.
+# Methods:
+# build() - builds a table from key/value pairs into shared memory or a file.
+# get() - returns the value associated with the given key.
+# contains_key() - returns whether or not a key is in the hash table.
+# table_load() - returns the load factor of the hash table.
+# empty_buckets() - returns the number of empty buckets in the hash table.
+# get_keys_and_values() - returns a dynamic array of all keys and values in the hash table.
+# __iter__() - iterates over the entries of the hash map, as HashEntry
+# objects made on the fly.
+# keys(), values(), items() - iterate over the keys, values or key/value
+# pairs of the hash map.
+# close() - releases this process's view of the table, also done when the
+# HashMap is garbage collected.
+# unlink() - deletes the shared memory block or file holding the table.
+
+import math
+import mmap
+import os
+import pickle
+import struct
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+
+from a6_include import (DynamicArray, HashEntry, HASH_FUNCTIONS, next_prime,
+                        hash_function_1)
+
+
+# block header: magic, capacity, size and the name of the hash function in
+# a6_include.HASH_FUNCTIONS. Everything is in native byte order
+_HEADER = struct.Struct('=8sQQ16s')
+_MAGIC = b'A6SHMAP1'
+
+# each slot is a hash and the offset of its record in the block, two native
+# unsigned 64 bit integers. Records come after the header, so offset 0
+# marks an empty slot
+_SLOT_SIZE = 16
+
+# each record is the length of the UTF-8 key and of the pickled value,
+# followed by both
+_RECORD = struct.Struct('=II')
+
+# max load factor, the same as hash_map_oa
+_THRESHOLD = 0.5
+
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+# names of the shared memory blocks built by this process. Processes forked
+# from it inherit the set along with its resource tracker
+_BUILT_HERE = set()
+
+
+def _probe(slots, data, shift: int, capacity: int, hash_value: int,
+           key_bytes: bytes) -> int:
+    """
+    Return the slot index holding key_bytes, or else the first empty one,
+    using the quadratic probing of hash_map_oa.HashMap._quad_probe. Keys
+    are only compared on slots whose hash matches
+    param slots: slot array, as 64 bit integers
+    param data: buffer holding the records
+    param shift: position in the block of data[0]
+    """
+    index = hash_value % capacity
+    step = 1
+
+    offset = slots[2*index + 1]
+    while offset != 0:
+        if slots[2*index] == hash_value:
+            start = offset - shift
+            keyLength, _ = _RECORD.unpack_from(data, start)
+            start += _RECORD.size
+            if data[start:start + keyLength] == key_bytes:
+                return index
+
+        # offsets 1, 4, 9, ... built up by adding 1, 3, 5, ...
+        index = (index + step) % capacity
+        step += 2
+        offset = slots[2*index + 1]
+
+    return index
+
+
+def _hash_function_name(function) -> str:
+    """
+    Return the name in HASH_FUNCTIONS of function, which may be a name or
+    one of the functions. Every process must hash a key the same way, so
+    the built-in hash, salted per process, is not allowed
+    """
+    for name, candidate in HASH_FUNCTIONS.items():
+        if function == name or function is candidate:
+            if name == 'builtin':
+                break
+            return name
+
+    shareable = ', '.join(name for name in HASH_FUNCTIONS if name != 'builtin')
+    raise ValueError(f"hash function {function!r} can't be shared, expected "
+                     f"one of {shareable}")
+
+
+def _open_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Return the existing shared memory block called name, without handing it
+    to this process's resource tracker, which would delete it when this
+    process exits. Only the builder owns the block
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        pass
+
+    # before Python 3.13 every SharedMemory is tracked. A block built in
+    # this process or the one it was forked from is already tracked for the
+    # builder by the same tracker, and unregistering would undo that
+    block = shared_memory.SharedMemory(name)
+    if name not in _BUILT_HERE:
+        resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+class HashMap:
+    def __init__(self, name: str = None, path: str = None) -> None:
+        """
+        Open a table built by HashMap.build, in this or any other process.
+        Nothing is copied, lookups read the block in place
+        param name: name of the shared memory block holding the table
+        param path: path of the file holding the table, used instead of name
+        """
+        self._path = path
+        self._shared = None
+        self._file = None
+        self._closed = True
+
+        if path is not None:
+            self._file = open(path, 'rb')
+            self._block = mmap.mmap(self._file.fileno(), 0,
+                                    access=mmap.ACCESS_READ)
+        else:
+            self._shared = _open_shared_memory(name)
+            self._block = self._shared.buf
+
+        self._attach()
+
+    def _attach(self) -> None:
+        """
+        helper method to read the header and set up views of the slots and
+        the whole block
+        """
+        self._buffer = memoryview(self._block)
+        magic, capacity, size, functionName = _HEADER.unpack_from(
+            self._buffer)
+        if magic != _MAGIC:
+            self._buffer.release()
+            raise ValueError("not a hash table built by HashMap.build")
+
+        self._capacity = capacity
+        self._size = size
+        self._hash_function = HASH_FUNCTIONS[
+            functionName.rstrip(b'\0').decode()]
+        self._slots = self._buffer[
+            _HEADER.size:_HEADER.size + _SLOT_SIZE * capacity].cast('Q')
+        self._closed = False
+
+    @classmethod
+    def build(cls, items, function='fnv1a', path: str = None) -> 'HashMap':
+        """
+        Build a table holding every key/value pair in items, sized for the
+        0.5 load factor so it never needs resizing, and open it. For a
+        repeated key the last value wins, as with put
+        param items: iterable of (key, value) tuples. Keys are strings,
+        values anything that can be pickled
+        param function: hash function, or its name in HASH_FUNCTIONS.
+        'builtin' is not allowed
+        param path: file to write the table to. If None, it goes in a new
+        shared memory block, see the name property
+        return HashMap: the new table, opened in this process
+        """
+        functionName = _hash_function_name(function)
+        hashFunction = HASH_FUNCTIONS[functionName]
+        items = list(items)
+
+        # capacity must be a prime number
+        capacity = next_prime(max(1, math.ceil(len(items) / _THRESHOLD)))
+        arenaStart = _HEADER.size + _SLOT_SIZE * capacity
+        slots = array('Q', bytes(_SLOT_SIZE * capacity))
+        arena = bytearray()
+        size = 0
+
+        for key, value in items:
+            keyBytes = key.encode()
+            hashValue = hashFunction(key) & _MASK_64
+            index = _probe(slots, arena, arenaStart, capacity, hashValue,
+                           keyBytes)
+
+            # a repeated key points at its new record, the old one is left
+            # unused in the arena
+            if slots[2*index + 1] == 0:
+                size += 1
+            slots[2*index] = hashValue
+            slots[2*index + 1] = arenaStart + len(arena)
+
+            valueBytes = pickle.dumps(value)
+            arena += _RECORD.pack(len(keyBytes), len(valueBytes))
+            arena += keyBytes
+            arena += valueBytes
+
+        header = _HEADER.pack(_MAGIC, capacity, size, functionName.encode())
+        total = arenaStart + len(arena)
+
+        if path is not None:
+            with open(path, 'wb') as file:
+                file.write(header)
+                file.write(slots)
+                file.write(arena)
+            return cls(path=path)
+
+        block = shared_memory.SharedMemory(create=True, size=total)
+        _BUILT_HERE.add(block.name)
+        block.buf[:_HEADER.size] = header
+        block.buf[_HEADER.size:arenaStart] = memoryview(slots).cast('B')
+        block.buf[arenaStart:total] = arena
+
+        # the builder keeps its handle to the block, so the block is deleted
+        # if the builder exits without unlink
+        hashMap = cls.__new__(cls)
+        hashMap._path = None
+        hashMap._file = None
+        hashMap._shared = block
+        hashMap._block = block.buf
+        hashMap._closed = True
+        hashMap._attach()
+        return hashMap
+
+    @property
+    def name(self) -> str:
+        """
+        Name of the shared memory block, for opening the table in another
+        process with HashMap(name). None for a table in a file
+        """
+        if self._shared is None:
+            return None
+        return self._shared.name
+
+    def __enter__(self) -> 'HashMap':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        # the views of the block must be released before SharedMemory or
+        # mmap closes it, or closing raises BufferError
+        if not self._closed:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Release this process's view of the table. The table itself stays
+        for other processes until unlink is called. Closing again does
+        nothing
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        self._slots.release()
+        self._buffer.release()
+
+        if self._shared is not None:
+            self._shared.close()
+        else:
+            self._block.close()
+            self._file.close()
+
+    def unlink(self) -> None:
+        """
+        Delete the shared memory block or file holding the table. Processes
+        that have it open can keep reading it until they close it
+        """
+        if self._shared is not None:
+            # a spawned process opening the block may have unregistered it
+            # from a tracker it shares with the builder. Registering again
+            # is harmless otherwise, and unlink unregisters it for good
+            if self._shared.name in _BUILT_HERE:
+                resource_tracker.register(self._shared._name, 'shared_memory')
+                _BUILT_HERE.discard(self._shared.name)
+            self._shared.unlink()
+        else:
+            os.remove(self._path)
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            offset = self._slots[2*i + 1]
+            if offset == 0:
+                out += str(i) + ': None\n'
+            else:
+                key, value = self._record(offset)
+                out += f"{i}: K: {key} V: {value}\n"
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _record(self, offset: int) -> tuple:
+        """
+        helper method to return the (key, value) of the record at offset
+        """
+        keyLength, valueLength = _RECORD.unpack_from(self._buffer, offset)
+        start = offset + _RECORD.size
+        key = bytes(self._buffer[start:start + keyLength]).decode()
+        start += keyLength
+        return key, pickle.loads(self._buffer[start:start + valueLength])
+
+    def _find_offset(self, key: str) -> int:
+        """
+        helper method to return the offset of the record holding key, or 0
+        if key is not present
+        """
+        hashValue = self._hash_function(key) & _MASK_64
+        index = _probe(self._slots, self._buffer, 0, self._capacity,
+                       hashValue, key.encode())
+        return self._slots[2*index + 1]
+
+    def get(self, key: str) -> object:
+        """
+        Get value associated with key
+        param key: key user is searching for
+        return object: target key's value, or None if key is not present
+        """
+        offset = self._find_offset(key)
+        if offset == 0:
+            return None
+
+        return self._record(offset)[1]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Check if key is in hashmap
+        param key: key user is searching for
+        return bool: True if key is found else False
+        """
+        return self._find_offset(key) != 0
+
+    def table_load(self) -> float:
+        """
+        Calculate and return load factor
+        load factor(lambda) = n(number of elements)/m(number of buckets)
+        return float: load factor
+        """
+        return self._size/self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty buckets.
+        empty buckets = m - n
+        return int: number of empty buckets
+        """
+        return self._capacity - self._size
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray that contains all keys and values in a hashmap
+        return DynamicArray: DynamicArray, contains tuples of key and value
+        """
+        tupleArr = DynamicArray()
+
+        for pair in self.items():
+            tupleArr.append(pair)
+
+        return tupleArr
+
+    def __iter__(self):
+        """
+        Enables iteration over the entries of the hashmap, like
+        hash_map_oa.HashMap. The table holds records, not entries, so each
+        one is a new HashEntry with the key, value and stored hash
+        """
+        for index in range(self._capacity):
+            offset = self._slots[2*index + 1]
+            if offset != 0:
+                key, value = self._record(offset)
+                yield HashEntry(key, value, self._slots[2*index])
+
+    def items(self):
+        """
+        Iterate over (key, value) tuples in the hashmap
+        """
+        for index in range(self._capacity):
+            offset = self._slots[2*index + 1]
+            if offset != 0:
+                yield self._record(offset)
+
+    def keys(self):
+        """
+        Iterate over the keys in the hashmap
+        """
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """
+        Iterate over the values in the hashmap
+        """
+        for _, value in self.items():
+            yield value
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nbuild/get example")
+    print("-----------------")
+    m = HashMap.build((('str' + str(i), i * 100) for i in range(150)),
+                      hash_function_1.__name__)
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    # any process can open the table by name, here a second handle
+    with HashMap(m.name) as other:
+        for i in range(0, 150, 37):
+            print(i, other.get('str' + str(i)), other.contains_key('str' + str(i)))
+        print(other.get('missing'), other.contains_key('missing'))
+
+    m.close()
+    m.unlink()
@@ -0,0 +1,441 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Open addressing hash map modeled on SwissTable. Next to the
+# keys and values, every slot has a control byte: empty, deleted, or 7 bits
+# of its key's hash (the tag). Slots are probed in groups of 8 whose
+# control bytes are read as one 64 bit integer, and bit tricks on that
+# integer find every slot in the group with a matching tag, or any empty
+# slot, at once. Keys are only compared in slots whose tag matches, so a
+# lookup miss almost never reads a key object.
+# Methods:
+# put() - adds or updates a new key/value pair to the hash map.
+# resize_table() - resizes the hash table to passed in new capacity.
+# table_load() - returns the current load factor of the hash table.
+# empty_buckets() - returns the number of empty buckets in the hash table.
+# get() - returns the value associated with the given key.
+# contains_key() - returns whether or not a key is in the hash table.
+# remove() - removes the key/value pair associated with the given key.
+# get_keys_and_values() - returns a dynamic array of all keys and values in the hash table.
+# clear() - clears all contents of the hash table without changing the underlying hash table capacity.
+# __iter__() - iterates over the full slots of the hash map, as HashEntry
+# objects made on the fly.
+# keys(), values(), items() - iterate over the keys, values or key/value
+# pairs of the hash map.
+
+import sys
+
+from a6_include import (DynamicArray, HashEntry, next_power_of_two,
+                        get_hash_function, hash_function_1, hash_function_2)
+
+
+# hashes are spread by multiplying with 2^64 / golden ratio, keeping the
+# low 64 bits (Fibonacci hashing). The high bits of the product depend on
+# every bit of the hash, so the group and tag are taken from there
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+_GOLDEN_64 = 0x9E3779B97F4A7C15
+
+# control bytes. A full slot holds its 7 bit tag, so its high bit is clear
+_EMPTY = 0x80
+_DELETED = 0xFE
+
+# slots per group, one control byte each in a 64 bit word
+_GROUP = 8
+
+# the byte value repeated in every byte of a word, and the high bits of
+# every byte of a word
+_LSB = 0x0101010101010101
+_MSB = 0x8080808080808080
+
+# a memoryview of the control bytes as 64 bit words is in native order, so
+# on big endian machines the first slot is the most significant byte
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+def _match_tag(word: int, tag: int) -> int:
+    """
+    Return a mask with the high bit set in each byte of word equal to tag.
+    A byte above a true match may be flagged as well; callers compare keys,
+    so a false positive only costs one comparison
+    """
+    x = word ^ (tag * _LSB)
+    return (x - _LSB) & ~x & _MSB
+
+
+def _match_empty(word: int) -> int:
+    """
+    Return a mask with the high bit set in each byte of word that is _EMPTY.
+    Both _EMPTY and _DELETED have the high bit set, only _DELETED has bit 1
+    """
+    return word & ~(word << 6) & _MSB
+
+
+class HashMap:
+    # max load factor, tags let groups run much fuller than plain probing
+    _THRESHOLD = 7 / 8
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that probes groups of control bytes
+        param function: hash function, or the name of one in
+        a6_include.HASH_FUNCTIONS such as 'fnv1a' or 'xxhash'. Its result is
+        multiplied out before use, so weak low bits are fine
+        """
+        # capacity must be a power of two, and at least one full group
+        self._capacity = next_power_of_two(max(capacity, _GROUP))
+        self._allocate(self._capacity)
+
+        self._hash_function = get_hash_function(function)
+        self._size = 0
+        self._tombstones = 0
+        self._version = 0
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        helper method to create empty control bytes, keys and values for
+        capacity slots
+        """
+        self._ctrl = bytearray([_EMPTY]) * capacity
+        self._words = memoryview(self._ctrl).cast('Q')
+
+        # the top bits of a hash pick one of the groups, the next 7 are its
+        # tag
+        self._shift = 64 - (len(self._words).bit_length() - 1)
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._ctrl[i] & 0x80:
+                out += (f"{i}: None "
+                        f"{'DEL' if self._ctrl[i] == _DELETED else ''}\n")
+            else:
+                out += f"{i}: K: {self._keys[i]} V: {self._values[i]}\n"
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _hash(self, key: str) -> int:
+        """
+        helper method to return the spread 64 bit hash of key
+        """
+        return (self._hash_function(key) * _GOLDEN_64) & _MASK_64
+
+    def _tag(self, hash_value: int) -> int:
+        """
+        helper method to return the 7 bit tag of a spread hash, the bits
+        just below the ones that pick its first group
+        """
+        return (hash_value >> (self._shift - 7)) & 0x7F
+
+    def _find(self, key: str, hash_value: int) -> int:
+        """
+        helper method to locate the slot holding key. Groups are visited in
+        triangular order 1, 3, 6, ... from the key's first group, which
+        covers every group of a power of two table. A group with an empty
+        slot ends the search, since put would have used that slot
+        param hash_value: spread hash of key
+        return int: slot index of key, or None if key is not present
+        """
+        words, keys = self._words, self._keys
+        mask = len(words) - 1
+        tag = self._tag(hash_value)
+        group = hash_value >> self._shift
+        step = 1
+
+        while True:
+            word = words[group]
+            matches = _match_tag(word, tag)
+            while matches:
+                slot = self._slot(group, matches)
+                if keys[slot] == key:
+                    return slot
+                matches &= matches - 1
+
+            if _match_empty(word):
+                return None
+
+            group = (group + step) & mask
+            step += 1
+
+    @staticmethod
+    def _slot(group: int, matches: int) -> int:
+        """
+        helper method to return the slot index of the lowest flagged byte in
+        matches, a mask from _match_tag or _match_empty for group
+        """
+        byte = ((matches & -matches).bit_length() >> 3) - 1
+        if _BIG_ENDIAN:
+            byte = _GROUP - 1 - byte
+        return group * _GROUP + byte
+
+    def _free_slot(self, hash_value: int) -> int:
+        """
+        helper method to return the first empty or deleted slot along the
+        probe sequence of hash_value
+        """
+        words = self._words
+        mask = len(words) - 1
+        group = hash_value >> self._shift
+        step = 1
+
+        # empty and deleted bytes are the only ones with the high bit set
+        while not words[group] & _MSB:
+            group = (group + step) & mask
+            step += 1
+
+        return self._slot(group, words[group] & _MSB)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        This method updates the key/value pair in the hashmap
+        param key: key to be updated
+        param value: value to be updated
+        conditions: if key is already in hashmap, update value @ key with new value
+                    if key is not in hashmap, a new key/value pair is added
+        """
+        hashValue = self._hash(key)
+
+        # update key/value pair at the key's slot
+        target = self._find(key, hashValue)
+        if target is not None:
+            self._values[target] = value
+            return
+
+        # a deleted control byte keeps a search going past its group like a
+        # full one, so both count towards the threshold. remove only leaves
+        # one in a group with no empty slot, and if they outnumber the keys
+        # a rebuild at the same capacity empties those groups again
+        if (self._size + self._tombstones + 1)/self._capacity > \
+                self._THRESHOLD:
+            if self._tombstones > self._size:
+                self._rehash(self._capacity)
+            else:
+                self.resize_table(self._capacity*2)
+
+        target = self._free_slot(hashValue)
+        if self._ctrl[target] == _DELETED:
+            self._tombstones -= 1
+
+        self._ctrl[target] = self._tag(hashValue)
+        self._keys[target] = key
+        self._values[target] = value
+        self._size += 1
+        self._version += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change capacity of the internal hash table to new_capacity
+        param new_capacity: new capacity to resize to
+        """
+        # Check if new capacity is greater than current size if not return
+        # without resizing
+        if new_capacity <= self._size:
+            return
+
+        # make sure new capacity is a power of two
+        new_capacity = next_power_of_two(max(new_capacity, _GROUP))
+
+        # entries are moved once into a table big enough to hold them all
+        while self._size/new_capacity > self._THRESHOLD:
+            new_capacity *= 2
+
+        self._rehash(new_capacity)
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        helper method to move every key/value pair into new arrays of
+        new_capacity, dropping deleted slots
+        param new_capacity: capacity of the new arrays
+        """
+        oldCtrl, oldKeys, oldValues = self._ctrl, self._keys, self._values
+
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        ctrl, keys, values = self._ctrl, self._keys, self._values
+
+        for old in range(len(oldCtrl)):
+            if oldCtrl[old] & 0x80:
+                continue
+
+            hashValue = self._hash(oldKeys[old])
+            target = self._free_slot(hashValue)
+            ctrl[target] = self._tag(hashValue)
+            keys[target] = oldKeys[old]
+            values[target] = oldValues[old]
+
+        self._tombstones = 0
+        self._version += 1
+
+    def table_load(self) -> float:
+        """
+        Calculate and return load factor
+        load factor(lambda) = n(number of elements)/m(number of buckets)
+        return float: load factor
+        """
+        return self._size/self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty buckets.
+        empty buckets = m - n
+        return int: number of empty buckets
+        """
+        return self._capacity-self._size
+
+    def get(self, key: str) -> object:
+        """
+        Get value associated with key
+        param key: key user is searching for
+        return object: target key's value
+        """
+        target = self._find(key, self._hash(key))
+        if target is None:
+            return None
+
+        return self._values[target]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Check if key is in hashmap
+        param key: key user is searching for
+        return bool: True if key is found else False
+        """
+        return self._find(key, self._hash(key)) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Searches for and removes target key from hashmap
+        param key: key user wishes to remove
+        """
+        target = self._find(key, self._hash(key))
+        if target is None:
+            return
+
+        # a group that already has an empty slot ends every search that
+        # reaches it, so no key further along relies on it being full and
+        # the slot can become empty again instead of deleted
+        if _match_empty(self._words[target // _GROUP]):
+            self._ctrl[target] = _EMPTY
+        else:
+            self._ctrl[target] = _DELETED
+            self._tombstones += 1
+
+        self._keys[target] = None
+        self._values[target] = None
+        self._size -= 1
+        self._version += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray that contains all keys and values in a hashmap
+        return DynamicArray: DynamicArray, contains tuples of key and value
+        """
+        tupleArr = DynamicArray()
+
+        for pair in self.items():
+            tupleArr.append(pair)
+
+        return tupleArr
+
+    def clear(self) -> None:
+        """
+        Clears all contents of the hashmap without changing underlying hash
+        table capacity
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+        self._version += 1
+
+    def _iter_slots(self):
+        """
+        Generator over the indices of full slots. Raises RuntimeError if
+        keys are added or removed while iterating
+        """
+        version = self._version
+        ctrl = self._ctrl
+
+        for slot in range(len(ctrl)):
+            if self._version != version:
+                raise RuntimeError("HashMap changed size during iteration")
+
+            if not ctrl[slot] & 0x80:
+                yield slot
+
+        if self._version != version:
+            raise RuntimeError("HashMap changed size during iteration")
+
+    def __iter__(self):
+        """
+        Enables iteration over the full slots of the hashmap, like
+        hash_map_oa.HashMap. No entries are stored, so each one is a new
+        HashEntry with the key and value. keys, values and items don't make
+        any objects
+        """
+        for slot in self._iter_slots():
+            yield HashEntry(self._keys[slot], self._values[slot])
+
+    def keys(self):
+        """
+        Iterate over the keys in the hashmap without copying them
+        """
+        for slot in self._iter_slots():
+            yield self._keys[slot]
+
+    def values(self):
+        """
+        Iterate over the values in the hashmap without copying them
+        """
+        for slot in self._iter_slots():
+            yield self._values[slot]
+
+    def items(self):
+        """
+        Iterate over (key, value) tuples in the hashmap without copying them
+        """
+        for slot in self._iter_slots():
+            yield self._keys[slot], self._values[slot]
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput example")
+    print("-----------")
+    # capacity is rounded up to a power of two, and groups fill to 7/8
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(),
+                  m.get_capacity())
+
+    print("\nremove example")
+    print("--------------")
+    # a slot becomes empty again if its group still has an empty slot,
+    # otherwise it is marked deleted so searches keep going past the group
+    m = HashMap(64, hash_function_2)
+    for i in range(56):
+        m.put(str(i), i)
+    print(m._ctrl.count(_EMPTY), m._ctrl.count(_DELETED))
+    for i in range(0, 56, 2):
+        m.remove(str(i))
+    print(m._ctrl.count(_EMPTY), m._ctrl.count(_DELETED))
+    print(m.get_size(), m.get('10'), m.get('11'), m.contains_key('55'))